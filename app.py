@@ -1,11 +1,19 @@
-from flask import Flask, send_from_directory, request, jsonify
+from flask import Flask, Response, send_from_directory, request, jsonify, stream_with_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-import os, json, glob
+import os, glob, hashlib, threading, time
+from collections import OrderedDict
 from config import Config
+import utils.store as store
+from utils.json_provider import FastJSONProvider, dumps_bytes
+from utils.gauge_index import GaugeSearchIndex
+import utils.vote_store as vote_store
+import utils.token_list as token_list
+import utils.request_metrics as request_metrics
 
 app = Flask(__name__)
-LL_INFO_CACHE_PATH = './data/ll_info.json'
+app.json = FastJSONProvider(app)
+CHART_TYPES = ('Weekly_APRs', 'APR_Since')
 
 # Configuration for the database
 app.config.from_object(Config)
@@ -15,6 +23,9 @@ CORS(app)  # This will enable CORS for all routes
 # Initialize the database
 db = SQLAlchemy(app)
 
+# Per-route latency, sizes, statuses and DB queries, served on /metrics
+request_metrics.init_app(app)
+
 class UserWeekInfo(db.Model):
     __tablename__ = 'user_week_info'
 
@@ -41,13 +52,13 @@ class UserWeekInfo(db.Model):
             'account': self.account,
             'week_id': self.week_id,
             'token': self.token,
-            'user_weight': float(self.user_weight),
-            'user_balance': float(self.user_balance),
-            'user_boost': float(self.user_boost),
+            'user_weight': self.user_weight,
+            'user_balance': self.user_balance,
+            'user_boost': self.user_boost,
             'user_stake_map': self.user_stake_map,
-            'rewards_earned': float(self.user_rewards_earned),
+            'rewards_earned': self.user_rewards_earned,
             'ybs': self.ybs,
-            'global_weight': float(self.global_weight),
+            'global_weight': self.global_weight,
             'global_stake_map': self.global_stake_map,
             'start_ts': self.start_ts,
             'start_block': self.start_block,
@@ -74,18 +85,157 @@ class UserInfo(db.Model):
             'account': self.account,
             'week_id': self.week_id,
             'token': self.token,
-            'weight': float(self.weight),
-            'balance': float(self.balance),
-            'boost': float(self.boost),
+            'weight': self.weight,
+            'balance': self.balance,
+            'boost': self.boost,
             'map': self.map,
-            'rewards_earned': float(self.rewards_earned),
+            'rewards_earned': self.rewards_earned,
             'ybs': self.ybs
         }
 
 
-def load_ll_info_cache():
-    with open(LL_INFO_CACHE_PATH, 'r') as file:
-        return json.load(file)
+# Parsed cache files keyed by path. An entry is only re-read when the file's
+# (inode, mtime, size) signature changes, so the refresh job's writes are
+# picked up without every request paying for a full json.load.
+_file_cache = {}
+_file_cache_lock = threading.Lock()
+# Views are keyed by client input (e.g. /info projections), so each file keeps
+# only its most recently used ones
+MAX_VIEWS_PER_FILE = 64
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def load_cache_entry(path):
+    """
+    Return the cache entry for path, re-reading only when the file changed.
+    Raises FileNotFoundError when the file does not exist.
+    """
+    signature = file_signature(path)
+    entry = _file_cache.get(path)
+    if entry is not None and entry['signature'] == signature:
+        return entry
+
+    with _file_cache_lock:
+        entry = _file_cache.get(path)
+        if entry is None or entry['signature'] != signature:
+            started = time.perf_counter()
+            with open(path, 'rb') as file:
+                raw = file.read()
+            request_metrics.observe_cache_read(path, time.perf_counter() - started)
+            entry = {
+                'signature': signature,
+                'raw': raw,
+                'data': None,
+                'views': OrderedDict(),
+                'objects': {},
+            }
+            _file_cache[path] = entry
+    return entry
+
+
+def load_cached_json(path):
+    entry = load_cache_entry(path)
+    if entry['data'] is None:
+        entry['data'] = app.json.loads(entry['raw'])
+    return entry['data']
+
+
+def cached_view(path, name, build):
+    """
+    Pre-serialized response body for build(data), memoized per file version.
+    build may return None when the requested section is missing.
+    """
+    entry = load_cache_entry(path)
+    view = get_view(entry, name)
+    if view is None:
+        payload = build(load_cached_json(path))
+        if payload is None:
+            view = {'body': None, 'etag': None}
+        else:
+            body = dumps_bytes(payload)
+            view = {'body': body, 'etag': hashlib.md5(body).hexdigest()}
+        put_view(entry, name, view)
+    return view
+
+
+def get_view(entry, name):
+    with _file_cache_lock:
+        view = entry['views'].get(name)
+        if view is not None:
+            entry['views'].move_to_end(name)
+        return view
+
+
+def put_view(entry, name, view):
+    """
+    Store a view, evicting the least recently used ones past MAX_VIEWS_PER_FILE
+    """
+    with _file_cache_lock:
+        entry['views'][name] = view
+        entry['views'].move_to_end(name)
+        while len(entry['views']) > MAX_VIEWS_PER_FILE:
+            entry['views'].popitem(last=False)
+
+
+def cached_object(path, name, build, load=load_cached_json):
+    """
+    build(load(path)) memoized per file version, for in-memory structures such
+    as search indexes that should be rebuilt only when the file changes.
+    """
+    entry = load_cache_entry(path)
+    if name not in entry['objects']:
+        value = build(load(path))
+        with _file_cache_lock:
+            entry['objects'].setdefault(name, value)
+    return entry['objects'][name]
+
+
+def cached_file_view(path):
+    """
+    The file's bytes as-is, for payloads that were serialized at write time.
+    """
+    entry = load_cache_entry(path)
+    view = get_view(entry, 'raw')
+    if view is None:
+        view = {'body': entry['raw'], 'etag': hashlib.md5(entry['raw']).hexdigest()}
+        put_view(entry, 'raw', view)
+    return view
+
+
+def cached_json_response(view):
+    if view['etag'] in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(view['body'], mimetype='application/json')
+    response.set_etag(view['etag'])
+    return response
+
+
+def cached_payload_response(name):
+    """
+    Serve a payload stored by the refresh job, picking the precompressed variant
+    the client accepts. Raises FileNotFoundError when the payload is missing.
+    """
+    path = store.payload_path(name)
+    for encoding, suffix in store.COMPRESSED_VARIANTS:
+        if request.accept_encodings.quality(encoding) <= 0:
+            continue
+        try:
+            view = cached_file_view(path + suffix)
+        except FileNotFoundError:
+            continue
+        response = cached_json_response(view)
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+
+    response = cached_json_response(cached_file_view(path))
+    response.vary.add('Accept-Encoding')
+    return response
 
 
 
@@ -94,8 +244,6 @@ def get_user_info():
     # Query the database with pagination
     account = request.args.get('account', 1, type=str)
     week_id = request.args.get('week_id', 1, type=int)
-    print(account)
-    print(week_id)
     results = UserWeekInfo.query.filter_by(account=account, week_id=week_id).all()
     
     if not results:
@@ -104,8 +252,112 @@ def get_user_info():
     results_json = [user_info.to_dict() for user_info in results]
     return jsonify(results_json)
 
+USER_WEEKS_MAX_ACCOUNTS = 500
+USER_WEEKS_MAX_WEEKS = 520
+USER_WEEKS_CHUNK_ROWS = 500
+
+# Response field -> column, in the same shape as UserWeekInfo.to_dict
+USER_WEEK_FIELDS = (
+    ('account', UserWeekInfo.account),
+    ('week_id', UserWeekInfo.week_id),
+    ('token', UserWeekInfo.token),
+    ('user_weight', UserWeekInfo.user_weight),
+    ('user_balance', UserWeekInfo.user_balance),
+    ('user_boost', UserWeekInfo.user_boost),
+    ('user_stake_map', UserWeekInfo.user_stake_map),
+    ('rewards_earned', UserWeekInfo.user_rewards_earned),
+    ('ybs', UserWeekInfo.ybs),
+    ('global_weight', UserWeekInfo.global_weight),
+    ('global_stake_map', UserWeekInfo.global_stake_map),
+    ('start_ts', UserWeekInfo.start_ts),
+    ('start_block', UserWeekInfo.start_block),
+    ('end_ts', UserWeekInfo.end_ts),
+    ('end_block', UserWeekInfo.end_block),
+    ('start_time_str', UserWeekInfo.start_time_str),
+    ('end_time_str', UserWeekInfo.end_time_str),
+)
+USER_WEEK_FIELD_NAMES = tuple(name for name, _ in USER_WEEK_FIELDS)
+
+
+def user_week_row_to_dict(row):
+    return dict(zip(USER_WEEK_FIELD_NAMES, row))
+
+
+def parse_user_weeks_args():
+    """
+    accounts, week_start, week_end from a JSON body or from the query string
+    (?accounts=a,b or repeated ?account=). Raises ValueError on bad input.
+    """
+    body = request.get_json(silent=True) or {}
+    accounts = body.get('accounts')
+    if isinstance(accounts, str):
+        accounts = accounts.split(',')
+    elif accounts is None:
+        accounts = request.args.getlist('account')
+        for value in request.args.getlist('accounts'):
+            accounts += value.split(',')
+    if not isinstance(accounts, list) or not all(isinstance(account, str) for account in accounts):
+        raise ValueError("accounts must be a list of addresses")
+    accounts = list(dict.fromkeys(account.strip() for account in accounts if account.strip()))
+    if not accounts:
+        raise ValueError("at least one account is required")
+    if len(accounts) > USER_WEEKS_MAX_ACCOUNTS:
+        raise ValueError(f"at most {USER_WEEKS_MAX_ACCOUNTS} accounts per request")
+
+    try:
+        week_start = int(body.get('week_start', request.args.get('week_start', 0)))
+        week_end = body.get('week_end', request.args.get('week_end'))
+        week_end = week_start + USER_WEEKS_MAX_WEEKS - 1 if week_end is None else int(week_end)
+    except (TypeError, ValueError):
+        raise ValueError("week_start and week_end must be integers")
+    if week_end < week_start or week_end - week_start >= USER_WEEKS_MAX_WEEKS:
+        raise ValueError(f"week range must be ascending and span at most {USER_WEEKS_MAX_WEEKS} weeks")
+    return accounts, week_start, week_end
+
+
+# Bulk variant of /user_info: many accounts over a week range in one indexed
+# query on the (account, week_id) primary key, streamed as NDJSON or a JSON array
+@app.route('/api/crvlol/user_weeks', methods=['GET', 'POST'])
+def get_user_weeks():
+    try:
+        accounts, week_start, week_end = parse_user_weeks_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    output = request.args.get('format', 'ndjson')
+    if output not in ('ndjson', 'json'):
+        return jsonify({"error": "format must be ndjson or json"}), 400
+
+    statement = (
+        db.select(*(column for _, column in USER_WEEK_FIELDS))
+        .where(UserWeekInfo.account.in_(accounts))
+        .where(UserWeekInfo.week_id.between(week_start, week_end))
+        .order_by(UserWeekInfo.account, UserWeekInfo.week_id)
+        .execution_options(yield_per=USER_WEEKS_CHUNK_ROWS)
+    )
+
+    def generate():
+        result = db.session.execute(statement)
+        first = True
+        if output == 'json':
+            yield b'['
+        for rows in result.partitions():
+            lines = [dumps_bytes(user_week_row_to_dict(row)) for row in rows]
+            if output == 'ndjson':
+                yield b'\n'.join(lines) + b'\n'
+            else:
+                yield (b'' if first else b',') + b','.join(lines)
+            first = False
+        if output == 'json':
+            yield b']'
+
+    mimetype = 'application/x-ndjson' if output == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
 class CrvLlHarvest(db.Model):
     __tablename__ = 'crv_ll_harvests'
+    # Backs the newest-first ordering and the keyset cursor of /harvests
+    __table_args__ = (db.Index('ix_crv_ll_harvests_timestamp_id', 'timestamp', 'id'),)
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     profit = db.Column(db.Numeric(30, 18))
     timestamp = db.Column(db.Integer)
@@ -116,28 +368,67 @@ class CrvLlHarvest(db.Model):
     txn_hash = db.Column(db.String)
     date_str = db.Column(db.String)
 
+HARVEST_TOTAL_MAX_AGE = 300
+_harvest_total = {'max_id': None, 'total': 0, 'counted_at': 0}
+
+
+def get_harvest_total():
+    """
+    Row count of crv_ll_harvests. max(id) is a cheap primary key lookup, so the
+    full count only reruns when new harvests were ingested, or after
+    HARVEST_TOTAL_MAX_AGE seconds to pick up deletes.
+    """
+    max_id = db.session.query(db.func.max(CrvLlHarvest.id)).scalar()
+    if _harvest_total['max_id'] != max_id or time.time() - _harvest_total['counted_at'] > HARVEST_TOTAL_MAX_AGE:
+        _harvest_total.update({
+            'max_id': max_id,
+            'total': CrvLlHarvest.query.count(),
+            'counted_at': time.time(),
+        })
+    return _harvest_total['total']
+
+
+@app.cli.command('create-indexes')
+def create_indexes():
+    """Create indexes declared on the models that the database is missing."""
+    for table in db.metadata.tables.values():
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+
 # Endpoint to return records from the crv_ll_harvests table
+# Pages by ?page= or, for deep pages, by the ?after=<timestamp>,<id> cursor in 'next'
 @app.route('/harvests', methods=['GET'])
+@app.route('/api/crvlol/harvests', methods=['GET'])
 def get_harvests():
     # Get query parameters for pagination
     page = request.args.get('page', 1, type=int)
     page = 1 if page < 1 else page
     per_page = request.args.get('per_page', 20, type=int)
     per_page = 20 if per_page < 1 or per_page > 100 else per_page
-    
-    # Calculate the offset
-    offset = (page - 1) * per_page
-    
-    # Query the database with pagination
-    harvests = CrvLlHarvest.query.order_by(CrvLlHarvest.timestamp.desc()).offset(offset).limit(per_page).all()
+    after = request.args.get('after', type=str)
+
+    query = CrvLlHarvest.query.order_by(CrvLlHarvest.timestamp.desc(), CrvLlHarvest.id.desc())
+    if after:
+        try:
+            after_timestamp, after_id = (int(part) for part in after.split(','))
+        except ValueError:
+            return jsonify({"error": "after must be <timestamp>,<id>"}), 400
+        # Seek past the cursor on the (timestamp, id) index instead of scanning an offset
+        query = query.filter(db.tuple_(CrvLlHarvest.timestamp, CrvLlHarvest.id) < (after_timestamp, after_id))
+    else:
+        # Calculate the offset
+        query = query.offset((page - 1) * per_page)
+
+    harvests = query.limit(per_page).all()
     
     # Get the total number of records for pagination metadata
-    total = CrvLlHarvest.query.count()
+    total = get_harvest_total()
     
     results = [
         {
             "id": harvest.id,
-            "profit": str(harvest.profit),
+            "profit": harvest.profit,
             "timestamp": harvest.timestamp,
             "name": harvest.name,
             "underlying": harvest.underlying,
@@ -147,20 +438,112 @@ def get_harvests():
             "date_str": harvest.date_str
         } for harvest in harvests
     ]
+
+    next_cursor = None
+    if len(harvests) == per_page:
+        next_cursor = f"{harvests[-1].timestamp},{harvests[-1].id}"
     
     return jsonify({
-        'page': page,
+        'page': None if after else page,
         'per_page': per_page,
         'total': total,
+        'next': next_cursor,
         'data': results
     })
 
+INFO_MAX_FIELD_PATHS = 32
+
+
+def parse_field_paths(value):
+    """
+    'a.b, c' -> ('a.b', 'c'), normalized so equivalent requests share a cached
+    view: sorted, deduplicated, and without paths inside another listed path
+    ('a' makes 'a.b' redundant).
+    """
+    if not value:
+        return ()
+    paths = {path.strip() for path in value.split(',') if path.strip()}
+    if len(paths) > INFO_MAX_FIELD_PATHS:
+        raise ValueError(f"at most {INFO_MAX_FIELD_PATHS} field paths")
+    return tuple(sorted(
+        path for path in paths
+        if not any(path.startswith(other + '.') for other in paths)
+    ))
+
+
+def project_fields(data, fields, exclude):
+    """
+    Keep only the dotted paths in fields (all of data when empty), then drop
+    the dotted paths in exclude. Missing paths are ignored. data is never
+    mutated: dicts along a changed path are copied.
+    """
+    if fields:
+        result = {}
+        for path in fields:
+            node = data
+            keys = path.split('.')
+            for key in keys:
+                if not isinstance(node, dict) or key not in node:
+                    break
+                node = node[key]
+            else:
+                target = result
+                for key in keys[:-1]:
+                    # Copy, since a shorter path may have put data's own dict here
+                    child = target.get(key)
+                    target[key] = dict(child) if isinstance(child, dict) else {}
+                    target = target[key]
+                target[keys[-1]] = node
+    else:
+        result = data
+
+    for path in exclude:
+        keys = path.split('.')
+        result = dict(result)
+        target = result
+        for key in keys[:-1]:
+            if not isinstance(target.get(key), dict):
+                break
+            target[key] = dict(target[key])
+            target = target[key]
+        else:
+            target.pop(keys[-1], None)
+    return result
+
+
+def info_response(fields=(), exclude=()):
+    if fields or exclude:
+        name = f"info?fields={','.join(fields)}&exclude={','.join(exclude)}"
+        build = lambda data: project_fields(data, fields, exclude)
+    else:
+        name, build = 'info', None
+
+    try:
+        if build is None:
+            return cached_payload_response('info')
+        return cached_json_response(cached_view(store.payload_path('info'), name, build))
+    except FileNotFoundError:
+        # Sections written without a full refresh yet: merge them in-process.
+        # The manifest changes on every section write, so it versions the merged view
+        merged = lambda manifest: store.read_all()
+        if build is not None:
+            merged = lambda manifest: project_fields(store.read_all(), fields, exclude)
+        return cached_json_response(cached_view(store.manifest_path(), name, merged))
+
+
+# ?fields= and ?exclude= take comma-separated dotted paths, e.g.
+# /info?fields=last_updated or /info?exclude=curve_gauge_data,chart_data.apr_since
 @app.route('/info')
 @app.route('/api/crvlol/info')
 def ll_info():
     try:
-        data = load_ll_info_cache()
-        return jsonify(data)
+        fields = parse_field_paths(request.args.get('fields'))
+        exclude = parse_field_paths(request.args.get('exclude'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        return info_response(fields, exclude)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -168,18 +551,25 @@ def ll_info():
 @app.route('/api/crvlol/treasury_balance_sheet')
 def treasury_balance_sheet():
     try:
-        cache_data = load_ll_info_cache()
-        balance_sheet = cache_data.get('treasury_balance_sheet')
-
-        if not balance_sheet:
-            return jsonify({"error": "Treasury balance sheet not found in cache"}), 404
-
-        return jsonify(balance_sheet)
+        return cached_payload_response('treasury_balance_sheet')
     except FileNotFoundError:
-        return jsonify({"error": "Cache file not found"}), 404
+        return jsonify({"error": "Treasury balance sheet not found in cache"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Token logos cached by the refresh job under cache/token-logos/<chain_id>/.
+# A logo file never changes once written, so let clients keep it for a day.
+TOKEN_LOGO_MAX_AGE = 24 * 60 * 60
+
+
+@app.route(f'{token_list.LOGO_ROUTE}/<int:chain_id>/<filename>')
+def get_token_logo(chain_id, filename):
+    return send_from_directory(
+        os.path.abspath(token_list.logo_dir(chain_id)),
+        filename.lower(),
+        max_age=TOKEN_LOGO_MAX_AGE,
+    )
+
 # Serve the most recent chart JSON
 @app.route('/charts/<chart_name>/<peg>')
 def get_chart(chart_name, peg):
@@ -191,57 +581,159 @@ def get_chart(chart_name, peg):
     latest_file = max(files, key=os.path.getctime)
     return send_from_directory(os.path.dirname(latest_file), os.path.basename(latest_file))
 
-# Serve raw chart data for Recharts
+# Serve chart data for Recharts, pre-formatted by scripts/apr_charts.py
 @app.route('/api/crvlol/chart-data/<chart_type>/<peg>')
 def get_chart_data(chart_type, peg):
+    if chart_type not in CHART_TYPES:
+        return jsonify({"error": "Invalid chart type"}), 400
+
+    peg_str = 'false' if peg.lower() == 'false' else 'true'
     try:
-        cache_data = load_ll_info_cache()
-        
-        if 'chart_data' not in cache_data:
-            return jsonify({"error": "Chart data not found in cache"}), 404
-        
-        chart_data = cache_data['chart_data']
-        
-        # Map chart types to cache keys
-        chart_mapping = {
-            'Weekly_APRs': 'weekly_aprs' if peg.lower() == 'false' else 'weekly_aprs_peg',
-            'APR_Since': 'apr_since' if peg.lower() == 'false' else 'apr_since_peg'
-        }
-        
-        if chart_type not in chart_mapping:
-            return jsonify({"error": "Invalid chart type"}), 400
-        
-        data_key = chart_mapping[chart_type]
-        if data_key not in chart_data:
-            return jsonify({"error": f"Chart data for {chart_type} not found"}), 404
-        
-        # Convert ISO date strings back to timestamps for Recharts
-        raw_data = chart_data[data_key]
-        formatted_data = []
-        
-        for item in raw_data:
-            # Convert ISO date string to timestamp
-            if isinstance(item['date'], str):
-                from datetime import datetime
-                date_obj = datetime.fromisoformat(item['date'].replace('Z', '+00:00'))
-                timestamp = int(date_obj.timestamp() * 1000)  # Convert to milliseconds
-            else:
-                timestamp = item['date']
-                
-            formatted_item = {
-                'date': timestamp,
-                'asdCRV': float(item.get('asdCRV', 0)) * 100,  # Convert to percentage
-                'yvyCRV': float(item.get('yvyCRV', 0)) * 100,
-                'ucvxCRV': float(item.get('ucvxCRV', 0)) * 100,
-            }
-            formatted_data.append(formatted_item)
-        
-        return jsonify(formatted_data)
-        
+        return cached_payload_response(f"chart_{chart_type}_{peg_str}")
+    except FileNotFoundError:
+        return jsonify({"error": f"Chart data for {chart_type} not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+GAUGE_SEARCH_DEFAULT_LIMIT = 10
+GAUGE_SEARCH_MAX_LIMIT = 50
+
+
+def get_gauge_index():
+    """
+    Search index over the curve_gauges section, rebuilt only when the refresh
+    job writes a new version of it.
+    """
+    return cached_object(
+        store.section_path('curve_gauges'),
+        'gauge_index',
+        lambda data: GaugeSearchIndex(data.get('curve_gauge_data'), data.get('curve_gauges_by_name')),
+    )
+
+
+@app.route('/api/gauge/search')
+def gauge_search():
+    query = request.args.get('q', '').strip()
+    try:
+        limit = min(max(int(request.args.get('limit', GAUGE_SEARCH_DEFAULT_LIMIT)), 1), GAUGE_SEARCH_MAX_LIMIT)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not query:
+        return jsonify({"data": {"query": query, "results": []}})
+
+    try:
+        results = get_gauge_index().search(query, limit)
+    except FileNotFoundError:
+        return jsonify({"error": "Gauge data not found in cache"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"data": {"query": query, "results": results}})
+
+
+@app.route('/api/gauge/basic')
+def gauge_basic():
+    gauge = request.args.get('gauge', '').strip()
+    if not gauge:
+        return jsonify({"error": "gauge is required"}), 400
+
+    try:
+        details = get_gauge_index().get(gauge)
+    except FileNotFoundError:
+        return jsonify({"error": "Gauge data not found in cache"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    if details is None:
+        return jsonify({"error": f"Unknown gauge {gauge}"}), 404
+    return jsonify({"data": details})
+
+
+GAUGE_VOTES_PER_PAGE = 50
+
+
+def load_cached_bytes(path):
+    return load_cache_entry(path)['raw']
+
+
+def get_vote_rollup(name, key):
+    """
+    Rows of a gauge vote rollup grouped by the lowercased key column, parsed
+    once per version of its Parquet file
+    """
+    return cached_object(
+        vote_store.rollup_path(name),
+        f'by_{key}',
+        lambda raw: vote_store.read_rollup(raw, key),
+        load=load_cached_bytes,
+    )
+
+
+def vote_to_dict(row):
+    return {
+        'id': row['id'],
+        'gauge': row['gauge'],
+        'account': row['account'],
+        'account_alias': row['account_alias'],
+        'date_str': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(row['time'])),
+        'timestamp': row['time'],
+        'block': row['block'],
+        'weight': row['weight'],
+        'amount': row['amount'],
+    }
+
+
+# Standing votes on a gauge (?gauge=) or by a user (?user=), newest first
+@app.route('/api/crvlol/gauge_votes')
+def get_gauge_votes():
+    gauge = request.args.get('gauge', '').strip().lower()
+    user = request.args.get('user', '').strip().lower()
+    if not gauge and not user:
+        return jsonify({"error": "gauge or user is required"}), 400
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', GAUGE_VOTES_PER_PAGE, type=int), GAUGE_VOTES_PER_PAGE)
+    if page < 1 or per_page < 1:
+        return jsonify({"error": "page and per_page must be positive"}), 400
+
+    try:
+        if gauge:
+            rows = get_vote_rollup('current_votes', 'gauge').get(gauge, [])
+            if user:
+                rows = [row for row in rows if row['account'].lower() == user]
+        else:
+            rows = get_vote_rollup('current_votes', 'account').get(user, [])
+            rows = sorted(rows, key=lambda row: row['time'], reverse=True)
+    except FileNotFoundError:
+        return jsonify({"error": "Gauge vote data not found in cache"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    start = (page - 1) * per_page
+    return jsonify({
+        'page': page,
+        'per_page': per_page,
+        'total': len(rows),
+        'data': [vote_to_dict(row) for row in rows[start:start + per_page]],
+    })
+
+
+# Per-epoch (weekly) vote totals for a gauge (?gauge=) or a user (?user=)
+@app.route('/api/crvlol/gauge_votes/epochs')
+def get_gauge_vote_epochs():
+    gauge = request.args.get('gauge', '').strip().lower()
+    user = request.args.get('user', '').strip().lower()
+    if bool(gauge) == bool(user):
+        return jsonify({"error": "pass exactly one of gauge or user"}), 400
+
+    try:
+        if gauge:
+            rows = get_vote_rollup('gauge_epochs', 'gauge').get(gauge, [])
+        else:
+            rows = get_vote_rollup('user_epochs', 'account').get(user, [])
     except FileNotFoundError:
-        return jsonify({"error": "Cache file not found"}), 404
+        return jsonify({"error": "Gauge vote data not found in cache"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    return jsonify({'data': rows})
 
 
 if __name__ == '__main__':
@@ -0,0 +1,86 @@
+"""
+Response serialization with the orjson-backed provider against Flask's default
+one, on synthetic payloads shaped like /info and a /harvests page.
+
+    pip install -r requirements-dev.txt
+    python -m pytest benchmarks/bench_json.py
+
+Results are grouped by payload, so each group compares the two providers.
+"""
+
+import datetime
+import decimal
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from utils.json_provider import FastJSONProvider
+
+GAUGE_COUNT = 1_500
+HARVESTS_PER_PAGE = 100
+
+
+def info_payload():
+    gauges = {}
+    for i in range(GAUGE_COUNT):
+        address = f'0x{i:040x}'
+        gauges[address] = {
+            'gauge': address,
+            'swap': f'0x{i + 10_000:040x}',
+            'name': f'Curve.fi Factory Pool: pool{i}',
+            'shortName': f'pool{i}',
+            'curve_key': f'factory-v2-{i}',
+            'lendingVaultAddress': None,
+            'gaugeCrvApy': [i * 0.013, i * 0.031],
+            'gaugeFutureCrvApy': [i * 0.011, i * 0.027],
+            'gauge_controller': {
+                'inflation_rate': str(10 ** 18 + i),
+                'get_gauge_weight': str(10 ** 21 * i),
+                'gauge_relative_weight': str(10 ** 15 * i),
+            },
+            'gauge_data': {'working_supply': str(10 ** 20 + i), 'totalSupply': str(10 ** 21 + i)},
+            'poolUrls': {'swap': [f'https://curve.finance/#/ethereum/pools/pool{i}/swap']},
+            'is_killed': False,
+        }
+    return {'data': {'curve_gauge_data': gauges, 'last_updated': 1_760_000_000}}
+
+
+def harvests_payload():
+    rows = [
+        {
+            'id': i,
+            'profit': decimal.Decimal(f'{i}.123456789012345678'),
+            'timestamp': 1_760_000_000 - i * 3_600,
+            'date_str': datetime.datetime(2025, 10, 1, i % 24).isoformat(),
+            'txn_hash': f'0x{i:064x}',
+            'compounder': f'0x{i % 3:040x}',
+            'underlying': f'0x{i % 5:040x}',
+            'block': 20_000_000 - i * 300,
+        }
+        for i in range(HARVESTS_PER_PAGE)
+    ]
+    return {'data': rows, 'page': 1, 'per_page': HARVESTS_PER_PAGE, 'total': 10_000}
+
+
+PAYLOADS = {
+    'info': info_payload,
+    'harvests': harvests_payload,
+}
+PROVIDERS = {
+    'flask_default': DefaultJSONProvider,
+    'orjson': FastJSONProvider,
+}
+
+
+@pytest.mark.parametrize('provider_name', list(PROVIDERS))
+@pytest.mark.parametrize('payload_name', list(PAYLOADS))
+def test_json_response(benchmark, payload_name, provider_name):
+    app = Flask(__name__)
+    provider = PROVIDERS[provider_name](app)
+    payload = PAYLOADS[payload_name]()
+    benchmark.group = payload_name
+
+    with app.app_context():
+        body = benchmark(lambda: provider.response(payload).get_data())
+    assert provider.loads(body)['data']
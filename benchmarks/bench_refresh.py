@@ -0,0 +1,102 @@
+"""
+Offline benchmarks of the refresh pipeline against a deterministic fake chain.
+
+    pip install -r requirements-dev.txt
+    python -m pytest benchmarks/bench_refresh.py
+    BENCH_RPC_LATENCY_MS=20 python -m pytest benchmarks/bench_refresh.py
+
+Each stage first runs once from a cold start under tracemalloc, to record the
+requests it sent and its peak memory and to check them against RPC_BUDGETS.
+pytest-benchmark then times BENCH_ROUNDS more cold runs. Budgets are the
+counts measured when they were set; a change that sends more requests fails
+here instead of showing up as a slower cron job.
+"""
+
+import os
+import time
+import tracemalloc
+
+import pytest
+
+from conftest import REPORT
+
+BENCH_ROUNDS = int(os.getenv('BENCH_ROUNDS', 3))
+
+# Most requests of each method a cold run may send
+RPC_BUDGETS = {
+    'update_info': {
+        'eth_blockNumber': 36,
+        'eth_getBlockByNumber': 13,
+        'eth_call': 78,
+        'http:coins.llama.fi': 1,
+    },
+    'build_treasury_balance_sheet': {
+        'eth_getBlockByNumber': 1,
+        'eth_call': 1,
+        'http:prices.wavey.info': 4,
+        'http:logos.example': 4,
+    },
+    'apr_charts.main': {
+        'eth_blockNumber': 40,
+        # The call cache looks the chain id up on first use, so each of the
+        # REFRESH_CONCURRENCY first concurrent reads may ask for it
+        'eth_chainId': 8,
+        'eth_getBlockByNumber': 79,
+        'eth_call': 69,
+        'http:coins.llama.fi': 1,
+        # The treasury prefers Wavey, so it asks Wavey even for tokens
+        # update_info has just priced from DefiLlama
+        'http:prices.wavey.info': 4,
+        'http:logos.example': 4,
+        'http:api.curve.finance': 1,
+        'http:raw.githubusercontent.com': 1,
+    },
+}
+
+STAGES = {
+    'update_info': lambda pipeline: pipeline.compounder_info.update_info(),
+    'build_treasury_balance_sheet': lambda pipeline: pipeline.treasury_balance_sheet.build_treasury_balance_sheet(),
+    'apr_charts.main': lambda pipeline: pipeline.apr_charts.main(),
+}
+
+
+def measure(pipeline, stage):
+    pipeline.fresh_state()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        STAGES[stage](pipeline)
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'stage': stage,
+        'seconds': seconds,
+        'peak_bytes': peak,
+        'requests': dict(pipeline.node.counts),
+        'rpc_latency_ms': pipeline.node.latency * 1000,
+    }
+
+
+@pytest.mark.parametrize('stage', list(STAGES))
+def test_refresh_stage(benchmark, pipeline, stage):
+    result = measure(pipeline, stage)
+    REPORT.append(result)
+    benchmark.extra_info.update(
+        peak_bytes=result['peak_bytes'],
+        requests=result['requests'],
+        rpc_latency_ms=pipeline.node.latency * 1000,
+    )
+
+    budget = RPC_BUDGETS[stage]
+    unbudgeted = sorted(set(result['requests']) - set(budget))
+    assert not unbudgeted, f'{stage} sent requests with no budget: {unbudgeted}'
+    over = {
+        method: (count, budget[method])
+        for method, count in result['requests'].items()
+        if count > budget[method]
+    }
+    assert not over, f'{stage} went over its request budget (sent, budget): {over}'
+
+    benchmark.pedantic(STAGES[stage], args=(pipeline,), setup=pipeline.fresh_state, rounds=BENCH_ROUNDS)
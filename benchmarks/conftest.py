@@ -0,0 +1,20 @@
+"""
+Reporting for the offline refresh benchmarks. The fake chain fixtures they use
+live in the top-level conftest.py.
+"""
+
+# Filled by the benchmarks, printed at the end of the run
+REPORT = []
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not REPORT:
+        return
+    terminalreporter.section('refresh pipeline requests')
+    terminalreporter.write_line(f"simulated latency per request: {REPORT[0]['rpc_latency_ms']:g} ms")
+    for row in REPORT:
+        requests_made = ', '.join(f'{method}={count}' for method, count in sorted(row['requests'].items()))
+        terminalreporter.write_line(
+            f"{row['stage']:<28} {row['seconds'] * 1000:9.1f} ms  "
+            f"peak {row['peak_bytes'] / 2 ** 20:7.2f} MiB  {requests_made}"
+        )
@@ -0,0 +1,355 @@
+"""
+Deterministic stand-in for brownie's chain, Contract and web3, plus the HTTP
+APIs the refresh job calls, so the pipeline can run offline. Every JSON-RPC
+request that would reach a node is counted by method (HTTP requests as
+http:<host>), and each can be slowed by a fixed latency.
+"""
+
+import threading
+import time
+import types
+from collections import Counter
+from urllib.parse import urlparse
+
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector
+
+from utils.multicall import AGGREGATE3_SELECTOR, MULTICALL3
+
+HEAD = 20_000_000
+HEAD_TS = 1_760_000_000
+BLOCK_TIME = 12
+# Every fake contract has code from this block on
+CREATION_BLOCK = 15_000_000
+PRECISION = 10 ** 18
+CURVE_GAUGE_COUNT = 200
+
+
+def block_timestamp(block):
+    # Slightly irregular, so the block index has to search rather than compute
+    return HEAD_TS - BLOCK_TIME * (HEAD - block) + (block * 7919) % 5
+
+
+def pps(block):
+    return PRECISION + (block - CREATION_BLOCK) * 10 ** 10
+
+
+# name -> (input types, output types, value(block, *args))
+FUNCTIONS = {
+    'pricePerShare': ([], ['uint256'], lambda block: pps(block)),
+    'convertToAssets': (['uint256'], ['uint256'], lambda block, shares: shares * pps(block) // PRECISION),
+    'totalUnderlying': ([], ['uint256'], lambda block: 10 ** 24 * pps(block) // PRECISION),
+    'totalSupply': ([], ['uint256'], lambda block: 10 ** 24),
+    'totalAssets': ([], ['uint256'], lambda block: 5 * 10 ** 24),
+    'platformFee': ([], ['uint256'], lambda block: 10 ** 8),
+    'FEE_DENOMINATOR': ([], ['uint256'], lambda block: 10 ** 9),
+    'performanceFee': ([], ['uint256'], lambda block: 1_000),
+    'lockedProfitDegradation': ([], ['uint256'], lambda block: 46 * 10 ** 12),
+    'feeInfo': ([], ['(address,uint32,uint32,uint32)'], lambda block: {'platformPercentage': 10 ** 6}),
+    'rewardInfo': ([], ['(uint128,uint32,uint48)'], lambda block: {'periodLength': 86_400 * 7}),
+    'get_dy': (['int128', 'int128', 'uint256'], ['uint256'], lambda block, i, j, dx: dx * 95 // 100),
+    'symbol': ([], ['string'], lambda block: 'TKN'),
+    'decimals': ([], ['uint8'], lambda block: 18),
+    'balanceOf': (['address'], ['uint256'], lambda block, account: 1_000 * PRECISION),
+    'total_amount': ([], ['uint256'], lambda block: 10_000 * PRECISION),
+    'available_limit': ([], ['uint256'], lambda block: 4_000 * PRECISION),
+}
+SELECTORS = {
+    function_signature_to_4byte_selector(f"{name}({','.join(inputs)})"): name
+    for name, (inputs, _, _) in FUNCTIONS.items()
+}
+
+
+def call_function(name, block, calldata):
+    inputs, outputs, value = FUNCTIONS[name]
+    args = decode(inputs, calldata) if inputs else ()
+    result = value(block, *args)
+    if isinstance(result, dict):
+        # Struct returns only matter to direct brownie calls; encode zeros
+        fields = outputs[0].strip('()').split(',')
+        return encode(outputs, [tuple('0x' + '00' * 20 if field == 'address' else 0 for field in fields)])
+    return encode(outputs, [result])
+
+
+class FakeNode:
+    """
+    Counts every request by method and sleeps latency seconds for each
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def request(self, method):
+        with self.lock:
+            self.counts[method] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reset(self):
+        with self.lock:
+            self.counts.clear()
+
+    def execute_call(self, tx, block):
+        """
+        eth_call against the fake state, including Multicall3 aggregate3
+        """
+        data = bytes.fromhex(tx['data'][2:]) if isinstance(tx['data'], str) else bytes(tx['data'])
+        if tx['to'].lower() == MULTICALL3.lower() and data[:4] == AGGREGATE3_SELECTOR:
+            calls = decode(['(address,bool,bytes)[]'], data[4:])[0]
+            results = []
+            for _, _, calldata in calls:
+                name = SELECTORS.get(calldata[:4])
+                if name is None:
+                    results.append((False, b''))
+                else:
+                    results.append((True, call_function(name, block, calldata[4:])))
+            return encode(['(bool,bytes)[]'], [results])
+        return call_function(SELECTORS[data[:4]], block, data[4:])
+
+
+class FakeMethod:
+    """Mimics a brownie ContractCall, which reads through web3.eth.call"""
+
+    def __init__(self, w3, address, name):
+        self.w3 = w3
+        self.address = address
+        self.name = name
+        self.inputs, self.outputs, self.value = FUNCTIONS[name]
+        self.selector = function_signature_to_4byte_selector(f"{name}({','.join(self.inputs)})")
+
+    def __call__(self, *args, block_identifier=None):
+        args = [int(arg) if isinstance(arg, float) else arg for arg in args]
+        self.w3.eth.call({'to': self.address, 'data': self.encode_input(*args)}, block_identifier or 'latest')
+        block = HEAD if block_identifier in (None, 'latest') else int(block_identifier)
+        # Struct results come back as dicts, the way brownie's ReturnValue is indexed
+        return self.value(block, *args)
+
+    def encode_input(self, *args):
+        return '0x' + (self.selector + encode(self.inputs, [int(arg) if isinstance(arg, float) else arg for arg in args])).hex()
+
+    def decode_output(self, hexstr):
+        values = decode(self.outputs, bytes.fromhex(hexstr[2:]))
+        return values[0] if len(values) == 1 else values
+
+
+class FakeContract:
+    """Mimics a brownie Contract: every function in FUNCTIONS on every address"""
+
+    def __init__(self, w3, address):
+        self.w3 = w3
+        self.address = address
+        self.abi = [
+            {
+                'type': 'function',
+                'name': name,
+                'inputs': [{'type': t} for t in inputs],
+                'outputs': [{'type': t} for t in outputs],
+            }
+            for name, (inputs, outputs, _) in FUNCTIONS.items()
+        ]
+
+    def __getattr__(self, name):
+        if name in FUNCTIONS:
+            return FakeMethod(self.w3, self.address, name)
+        raise AttributeError(name)
+
+
+class FakeChain:
+    """Mimics brownie's chain, which reads through web3"""
+
+    def __init__(self, w3):
+        self.w3 = w3
+        self.id = 1
+
+    @property
+    def height(self):
+        return self.w3.eth.block_number
+
+    def time(self):
+        # brownie computes this locally
+        return HEAD_TS + 30
+
+    def __getitem__(self, block):
+        return types.SimpleNamespace(**self.w3.eth.get_block(block))
+
+
+class FakeMiddlewareOnion:
+    """Innermost middleware first, like web3's add() / inject(layer=0)"""
+
+    def __init__(self):
+        self.middlewares = []
+
+    def add(self, middleware, name=None):
+        self.middlewares.append((name, middleware))
+
+    def inject(self, middleware, name=None, layer=None):
+        self.middlewares.insert(layer or 0, (name, middleware))
+
+    def __contains__(self, name):
+        return any(existing == name for existing, _ in self.middlewares)
+
+
+class FakeWeb3Contract:
+    """Mimics the parts of a web3 contract that utils.multicall.encode_call uses"""
+
+    def __init__(self, address, abi):
+        self.address = address
+        self.functions = types.SimpleNamespace()
+        self.abi = {entry['name']: entry for entry in abi}
+
+    def get_function_by_name(self, name):
+        return types.SimpleNamespace(abi=self.abi[name])
+
+    def encodeABI(self, fn_name, args):
+        types_ = [param['type'] for param in self.abi[fn_name]['inputs']]
+        selector = function_signature_to_4byte_selector(f"{fn_name}({','.join(types_)})")
+        return '0x' + (selector + encode(types_, args)).hex()
+
+
+class FakeEth:
+    """
+    Every request goes through the middleware onion to the fake node, the way
+    web3 sends it
+    """
+
+    def __init__(self, node, w3):
+        self.node = node
+        self.w3 = w3
+        self._chain_key = None
+        self._chain = None
+
+    def _send(self, method, params):
+        self.node.request(method)
+        if method == 'eth_blockNumber':
+            result = hex(HEAD)
+        elif method == 'eth_chainId':
+            result = '0x1'
+        elif method == 'eth_getBlockByNumber':
+            block = HEAD if params[0] == 'latest' else int(params[0], 16)
+            result = {'number': block, 'timestamp': block_timestamp(block)}
+        elif method == 'eth_getCode':
+            result = '0x60' if int(params[1], 16) >= CREATION_BLOCK else '0x'
+        elif method == 'eth_call':
+            block = HEAD if params[1] == 'latest' else int(params[1], 16)
+            result = '0x' + self.node.execute_call(params[0], block).hex()
+        else:
+            raise ValueError(f'fake node does not implement {method}')
+        return {'jsonrpc': '2.0', 'id': 0, 'result': result}
+
+    def _request(self, method, params):
+        # web3 builds the middleware chain once per set of middlewares, not per request
+        key = tuple(middleware for _, middleware in self.w3.middleware_onion.middlewares)
+        if key != self._chain_key:
+            make_request = self._send
+            for middleware in key:
+                make_request = middleware(make_request, self.w3)
+            self._chain_key, self._chain = key, make_request
+        return self._chain(method, params)['result']
+
+    @staticmethod
+    def _block_param(block_identifier):
+        if block_identifier in (None, 'latest'):
+            return 'latest'
+        return hex(int(block_identifier))
+
+    @property
+    def block_number(self):
+        return int(self._request('eth_blockNumber', []), 16)
+
+    @property
+    def chain_id(self):
+        return int(self._request('eth_chainId', []), 16)
+
+    def get_block(self, block_identifier):
+        return self._request('eth_getBlockByNumber', [self._block_param(block_identifier), False])
+
+    def get_code(self, address, block_identifier=None):
+        code = self._request('eth_getCode', [address, self._block_param(block_identifier or HEAD)])
+        return bytes.fromhex(code[2:])
+
+    def call(self, tx, block_identifier='latest'):
+        return bytes.fromhex(self._request('eth_call', [tx, self._block_param(block_identifier)])[2:])
+
+    def contract(self, address, abi):
+        return FakeWeb3Contract(address, abi)
+
+
+class FakeWeb3:
+    def __init__(self, node):
+        self.middleware_onion = FakeMiddlewareOnion()
+        self.provider = types.SimpleNamespace(endpoint_uri='fake://node')
+        self.eth = FakeEth(node, self)
+        self.ens = types.SimpleNamespace(name=lambda address: None)
+
+    @staticmethod
+    def to_checksum_address(address):
+        return address
+
+
+def make_brownie_module(node):
+    brownie = types.ModuleType('brownie')
+    brownie.web3 = FakeWeb3(node)
+    brownie.Contract = lambda address: FakeContract(brownie.web3, address)
+    brownie.chain = FakeChain(brownie.web3)
+    brownie.ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+    brownie.accounts = []
+    return brownie
+
+
+def curve_gauges():
+    gauges = {}
+    for i in range(CURVE_GAUGE_COUNT):
+        gauge = f'0x{i + 1:040x}'
+        gauges[f'factory-v2-{i} ({gauge[:6]})'] = {
+            'gauge': gauge,
+            'swap': f'0x{i + 10_001:040x}',
+            'name': f'Curve.fi Factory Pool: pool{i}',
+            'shortName': f'pool{i}',
+            'is_killed': i % 10 == 0,
+            'gauge_controller': {'inflation_rate': '1000', 'get_gauge_weight': '10', 'gauge_relative_weight': '5'},
+            'gauge_data': {'working_supply': '100'},
+        }
+    return gauges
+
+
+class FakeResponse:
+    def __init__(self, payload=None, content=b'', status_code=200, headers=None):
+        self.payload = payload
+        self.content = content
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(f'HTTP {self.status_code}')
+
+
+class FakeHttp:
+    """Stands in for requests.get against every API the refresh job calls"""
+
+    def __init__(self, node):
+        self.node = node
+
+    def get(self, url, params=None, headers=None, timeout=None, **kwargs):
+        parsed = urlparse(url)
+        self.node.request(f'http:{parsed.netloc}')
+        if parsed.netloc == 'coins.llama.fi':
+            coins = parsed.path.rsplit('/', 1)[-1].split(',')
+            return FakeResponse({'coins': {coin: {'price': 0.5} for coin in coins}})
+        if parsed.netloc == 'prices.wavey.info':
+            return FakeResponse({
+                'summary': {'median_price': 0.5},
+                'token': {'logo_url': f"https://logos.example/{params['token']}.png"},
+            })
+        if parsed.netloc == 'api.curve.finance':
+            return FakeResponse({'success': True, 'data': curve_gauges()})
+        if url.endswith('.json'):
+            return FakeResponse({'tokens': []}, headers={'ETag': '"1"'})
+        return FakeResponse(content=b'\x89PNG', headers={'Content-Type': 'image/png'})
+
@@ -1,4 +1,7 @@
 # compounders_data.py
+# Each compounder may also set 'deploy_block', the block it was deployed in;
+# the contract registry then takes it as the creation block instead of
+# searching the chain for it.
 
 CURVE_LIQUID_LOCKER_COMPOUNDERS = {
     '0xde2bEF0A01845257b4aEf2A2EAa48f6EAeAfa8B7': {
@@ -0,0 +1,88 @@
+"""
+Fixtures shared by the tests and the offline benchmarks. They run the code
+that imports brownie against the deterministic fake chain in
+benchmarks/fake_chain.py. Nothing here runs on import, so test files that do
+not ask for these fixtures run without brownie installed.
+"""
+
+import importlib
+import os
+import sys
+import types
+
+import pytest
+import requests
+
+from benchmarks.fake_chain import FakeHttp, FakeNode, make_brownie_module
+
+# Simulated round trip of every RPC and HTTP request, in milliseconds
+RPC_LATENCY_MS = float(os.getenv('BENCH_RPC_LATENCY_MS', 0))
+
+PIPELINE_MODULES = (
+    'utils.block_index',
+    'utils.call_cache',
+    'utils.concurrency',
+    'utils.prices',
+    'utils.registry',
+    'utils.rpc_metrics',
+    'utils.token_list',
+    'utils.ens',
+    'scripts.compounder_info',
+    'scripts.treasury_balance_sheet',
+    'scripts.apr_charts',
+)
+
+
+@pytest.fixture(scope='session')
+def node():
+    node = FakeNode(RPC_LATENCY_MS / 1000)
+    previous = sys.modules.get('brownie')
+    sys.modules['brownie'] = make_brownie_module(node)
+    yield node
+    if previous is None:
+        sys.modules.pop('brownie', None)
+    else:
+        sys.modules['brownie'] = previous
+
+
+@pytest.fixture
+def pipeline(node, tmp_path, monkeypatch):
+    """
+    The refresh pipeline's modules wired to the fake chain and APIs.
+    pipeline.fresh_state() gives the next run a cold start: an empty working
+    directory, no in-process caches and zeroed request counts.
+    """
+    monkeypatch.setattr(requests, 'get', FakeHttp(node).get)
+    modules = types.SimpleNamespace(**{
+        name.rsplit('.', 1)[-1]: importlib.import_module(name) for name in PIPELINE_MODULES
+    })
+    # Source pacing is a politeness limit, not work; keep it out of the timings
+    for source in modules.prices.SOURCE_RATE_LIMITS:
+        monkeypatch.setitem(modules.prices.SOURCE_RATE_LIMITS, source, 0)
+
+    rounds = []
+
+    def fresh_state():
+        directory = tmp_path / f'run{len(rounds)}'
+        directory.mkdir()
+        rounds.append(directory)
+        monkeypatch.chdir(directory)
+
+        modules.block_index.get_block_index.cache_clear()
+        modules.registry.get_registry.cache_clear()
+        modules.ens.get_store.cache_clear()
+        modules.apr_charts.get_contract.cache_clear()
+        modules.treasury_balance_sheet.get_erc20_contract.cache_clear()
+        modules.treasury_balance_sheet.get_vest_receiver_contract.cache_clear()
+        modules.call_cache._installed.clear()
+        modules.rpc_metrics._installed.clear()
+        modules.concurrency._buckets.clear()
+        modules.prices._cache = None
+        modules.prices._latency.clear()
+        modules.token_list._index = None
+        sys.modules['brownie'].web3.middleware_onion.middlewares.clear()
+        node.reset()
+
+    modules.fresh_state = fresh_state
+    modules.node = node
+    return modules
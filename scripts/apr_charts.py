@@ -1,25 +1,55 @@
-from brownie import Contract, chain
-import pandas as pd
+from brownie import Contract, chain, web3
 import requests
 from datetime import datetime, timedelta
+from functools import lru_cache
 from compounders_info import CURVE_LIQUID_LOCKER_COMPOUNDERS
 import os
 import glob
 import json
 from scripts.compounder_info import update_info
-from scripts.treasury_balance_sheet import build_treasury_balance_sheet
-import utils.utils as utils
+from scripts.treasury_balance_sheet import build_treasury_balance_sheet, WALLETS, TREASURY_RETURN_VEST
+import utils.store as store
+import utils.prices as prices
+from utils.multicall import Multicall
+import utils.block_index as block_index
+import utils.registry as registry
+import utils.call_cache as call_cache
+import utils.rpc_metrics as rpc_metrics
+from utils.concurrency import bounded_map, install_rate_limit
 
 DAY = 60 * 60 * 24
 WEEK = DAY * 7
 YEAR = DAY * 365
 QUARTER = YEAR / 4
+PRECISION = 10 ** 18
+PEG_AMOUNT = 10_000 * PRECISION
 DATE_FORMAT = '%m-%d'
 CLEAN_UP_CHARTS_OLDER_THAN_DAY = 10
+# A week saved less than this long after it closed is recomputed on the next
+# run, since its end block could still reorg (12 second blocks)
+WEEK_SETTLE_SECONDS = block_index.FINALITY_DEPTH * 12
+# Block reads in flight at once; 1 runs the sampling loops sequentially
+REFRESH_CONCURRENCY = int(os.getenv('REFRESH_CONCURRENCY', 8))
+# Requests per second against the RPC endpoint; 0 disables the limit
+RPC_RATE_LIMIT = float(os.getenv('RPC_RATE_LIMIT', 0))
+
+# (chart_type, peg) as requested by /api/crvlol/chart-data -> chart_data key
+CHART_SERIES = {
+    ('Weekly_APRs', 'false'): 'weekly_aprs',
+    ('Weekly_APRs', 'true'): 'weekly_aprs_peg',
+    ('APR_Since', 'false'): 'apr_since',
+    ('APR_Since', 'true'): 'apr_since_peg',
+}
 
 
 def main():
-    update_info()
+    store.migrate_legacy_cache()
+    eth_call_cache = call_cache.install()
+    install_rate_limit(web3, RPC_RATE_LIMIT)
+    rpc = rpc_metrics.install()
+    registry.seed_known_contracts(WALLETS, [('Treasury Return Vest', TREASURY_RETURN_VEST)])
+    rpc_metrics.register_contracts(registry.known_contracts())
+    update_info(publish=False)
     if not os.path.exists('charts'):
         os.makedirs('charts')
 
@@ -50,7 +80,7 @@ def main():
     aprs_weekly = weekly_apr()
     aprs_since = apr_since()
 
-    # Save raw chart data and Curve gauge data to ll_info.json
+    # Save raw chart data and Curve gauge data to the cache store
     save_chart_data_to_cache(
         aprs_weekly,
         None,
@@ -58,7 +88,14 @@ def main():
         None,
         curve_gauge_data,
         treasury_balance_sheet,
+        publish=False,
     )
+    # Pre-serialized and precompressed /info and treasury responses, built
+    # once from every section this run wrote
+    store.publish_info_payloads()
+    print(f"eth_call cache: {eth_call_cache.stats()}")
+    print(f"price sources: {prices.latency_stats()}")
+    print(f"RPC metrics written to {rpc.write('apr_charts')}")
 
     # Generate Altair charts (keeping existing functionality)
     # plot_aprs('Weekly_APRs_False', aprs_weekly)
@@ -96,11 +133,11 @@ def fetch_curve_gauge_data():
 
 def get_cached_curve_data():
     """
-    Get cached Curve gauge data from ll_info.json
+    Get cached Curve gauge data from the cache store
     Returns tuple of (gauge_data, gauges_by_name) or (None, None) if not available
     """
     try:
-        cache_data = utils.load_from_json('data/ll_info.json')
+        cache_data = store.read_section('curve_gauges')
         if cache_data and 'curve_gauge_data' in cache_data and 'curve_gauges_by_name' in cache_data:
             gauge_data = cache_data.get('curve_gauge_data', {})
             gauges_by_name = cache_data.get('curve_gauges_by_name', {})
@@ -118,45 +155,136 @@ def get_cached_curve_data():
         return None, None
 
 
-def get_peg_data_for_block(block):
+def get_block_reads(block):
     """
-    Get peg data for all pools at a specific block
-    Returns dict with pool symbols as keys and peg values as values
+    Read PPS and peg of every compounder at a block in one Multicall3 call
+    Returns {'pps': {vault address: pps}, 'peg': {symbol: peg}}
     """
-    peg_data = {}
+    batch = Multicall(block)
     for address, data in CURVE_LIQUID_LOCKER_COMPOUNDERS.items():
-        peg_data[data['symbol']] = get_peg(data['pool'], block)
-    return peg_data
+        vault = get_contract(address)
+        symbol = data['symbol']
+        if symbol == 'asdCRV':
+            # convertToAssets reverts before the vault has assets; pps is None then
+            batch.add((address, 'assets'), vault, 'convertToAssets', PRECISION, default=None)
+        elif symbol == 'yvyCRV':
+            batch.add((address, 'assets'), vault, 'pricePerShare')
+        elif symbol == 'ucvxCRV':
+            batch.add((address, 'assets'), vault, 'totalUnderlying')
+            batch.add((address, 'supply'), vault, 'totalSupply')
+        batch.add((address, 'peg'), get_contract(data['pool']), 'get_dy', 1, 0, PEG_AMOUNT)
+    results = batch.execute()
+
+    reads = {'pps': {}, 'peg': {}}
+    for address, data in CURVE_LIQUID_LOCKER_COMPOUNDERS.items():
+        if results[(address, 'assets')] is None:
+            pps = None
+        elif data['symbol'] == 'ucvxCRV':
+            pps = results[(address, 'assets')] / results[(address, 'supply')]
+        else:
+            pps = results[(address, 'assets')] / PRECISION
+        reads['pps'][address] = pps
+        reads['peg'][data['symbol']] = results[(address, 'peg')] / PEG_AMOUNT
+    return reads
+
+
+def get_reads_for_blocks(blocks):
+    """
+    get_block_reads for every distinct block, one RPC each, with up to
+    REFRESH_CONCURRENCY blocks read concurrently
+    """
+    blocks = sorted(set(blocks))
+    # Build the Contract objects up front rather than from the worker threads
+    for address, data in CURVE_LIQUID_LOCKER_COMPOUNDERS.items():
+        get_contract(address)
+        get_contract(data['pool'])
+    return dict(zip(blocks, bounded_map(get_block_reads, blocks, REFRESH_CONCURRENCY)))
+
+
+@lru_cache(maxsize=None)
+def get_contract(address):
+    return Contract(address)
 
 
 def calculate_apr(start_pps, end_pps, time_period):
     """
-    Calculate APR without peg adjustment
+    Calculate APR without peg adjustment. Windows starting before the vault
+    had assets (pps None or 0) count as 0, as in compounder_info.apr_since.
     """
+    if not start_pps or end_pps is None or time_period == 0:
+        return 0
     gain = end_pps - start_pps
     apr = gain / start_pps / (time_period / YEAR)
     return apr
 
 
 
-def weekly_apr():
+def load_weekly_history():
+    """
+    Weekly samples saved by earlier runs, keyed by week end timestamp.
+    Rows from before samples carried 'ts', missing a compounder, or saved
+    within WEEK_SETTLE_SECONDS of their week's end are skipped so that they
+    get recomputed.
+    """
+    chart_data = store.read_section('chart_data').get('chart_data', {})
+    rows = chart_data.get('weekly_aprs', [])
+    saved_at = chart_data.get('last_updated', 0)
+    symbols = [data['symbol'] for data in CURVE_LIQUID_LOCKER_COMPOUNDERS.values()]
+    history = {}
+    for row in rows:
+        if 'ts' not in row or any(symbol not in row for symbol in symbols):
+            continue
+        if saved_at - row['ts'] < WEEK_SETTLE_SECONDS:
+            continue
+        row = dict(row)
+        if isinstance(row['date'], str):
+            row['date'] = datetime.fromisoformat(row['date'])
+        history[row['ts']] = row
+    return history
+
+
+def weekly_apr(history=None):
+    """
+    APR of each of the last QUARTER of closed weeks. Closed weeks never change,
+    so weeks already in history are reused; only weeks that closed since the
+    last run, plus the most recent week, are read from chain.
+    """
     current_time = chain.time() - 5
     current_week = current_time // WEEK * WEEK
     aprs = []
     sample_width = WEEK
     chart_width = QUARTER
     num_samples = int(chart_width // sample_width)
-    
-    for i in range(0, num_samples):
-        week_end = current_week - (WEEK * i)
-        end_block, _ = get_block_and_ts(week_end)
-        start_block = closest_block_before_timestamp(week_end - WEEK)
+    if history is None:
+        history = load_weekly_history()
+
+    week_ends = [current_week - (WEEK * i) for i in range(0, num_samples)]
+    # The most recent week is always recomputed in case its end block was still
+    # close to the head when it was last sampled
+    pending = [week_end for i, week_end in enumerate(week_ends) if i == 0 or week_end not in history]
+    print(f"Weekly APRs: computing {len(pending)} of {num_samples} weeks")
+
+    # Resolve every pending week boundary in one pass over the block index
+    boundary_blocks = block_index.blocks_after_timestamps(pending + [week_end - WEEK for week_end in pending])
+    windows = [
+        (week_end, boundary_blocks[week_end], boundary_blocks[week_end - WEEK])
+        for week_end in pending
+    ]
+
+    # Consecutive weeks share a boundary block, so each block is read once
+    block_reads = get_reads_for_blocks(
+        [block for _, end_block, start_block in windows for block in (end_block, start_block)]
+    )
+
+    computed = {}
+    for week_end, end_block, start_block in windows:
         end_date = datetime.fromtimestamp(week_end)
         
         # Get peg data for current block only
-        end_peg_data = get_peg_data_for_block(end_block)
+        end_peg_data = block_reads[end_block]['peg']
         
         sample = {
+            'ts': week_end,
             'date': end_date,
             'block': end_block,
             'start_block': start_block
@@ -168,14 +296,18 @@ def weekly_apr():
         
         # Calculate APR for each compounder
         for address, data in CURVE_LIQUID_LOCKER_COMPOUNDERS.items():
-            end_pps = get_pps(address, end_block)
-            start_pps = get_pps(address, start_block)
+            end_pps = block_reads[end_block]['pps'][address]
+            start_pps = block_reads[start_block]['pps'][address]
             
             apr = calculate_apr(start_pps, end_pps, WEEK)
             
             sample[data['symbol']] = apr
         
-        aprs.append(sample)
+        computed[week_end] = sample
+
+    # Weeks that fell out of the chart window are dropped here
+    for week_end in week_ends:
+        aprs.append(computed.get(week_end) or history[week_end])
     
     return aprs
 
@@ -186,14 +318,22 @@ def apr_since():
     sample_width = WEEK
     chart_width = QUARTER
     num_samples = int(chart_width // sample_width)
-    
-    for i in range(0, num_samples):
-        sample_block, sample_ts = get_block_and_ts(current_ts - (sample_width * i))
+
+    sample_blocks = block_index.blocks_after_timestamps(
+        [current_ts - (sample_width * i) for i in range(0, num_samples)]
+    )
+    samples = [
+        (sample_blocks[ts], block_index.get_block_timestamp(sample_blocks[ts]))
+        for ts in sorted(sample_blocks, reverse=True)
+    ]
+    block_reads = get_reads_for_blocks([current_block] + [block for block, _ in samples])
+
+    # Get peg data for current block only
+    current_peg_data = block_reads[current_block]['peg']
+
+    for sample_block, sample_ts in samples:
         elapsed_time = current_ts - sample_ts
         
-        # Get peg data for current block only
-        current_peg_data = get_peg_data_for_block(current_block)
-        
         dt_object = datetime.fromtimestamp(sample_ts)
         sample = {
             'ts': sample_ts,
@@ -208,8 +348,8 @@ def apr_since():
         
         # Calculate APR for each compounder
         for address, data in CURVE_LIQUID_LOCKER_COMPOUNDERS.items():
-            start_pps = get_pps(address, sample_block)
-            end_pps = get_pps(address, current_block)
+            start_pps = block_reads[sample_block]['pps'][address]
+            end_pps = block_reads[current_block]['pps'][address]
             
             apr = calculate_apr(start_pps, end_pps, elapsed_time)
             
@@ -220,26 +360,6 @@ def apr_since():
     return aprs
 
 
-def get_peg(pool, block):
-    pool = Contract(pool)
-    amount = 10_000e18
-    return pool.get_dy(1, 0, amount, block_identifier=block) / amount
-
-
-def get_pps(vault_address, block):
-    vault = Contract(vault_address)
-    symbol = CURVE_LIQUID_LOCKER_COMPOUNDERS[vault_address]['symbol']
-    if symbol == 'asdCRV':
-        return vault.convertToAssets(1e18, block_identifier=block) / 1e18
-    elif symbol == 'yvyCRV':
-        return vault.pricePerShare(block_identifier=block) / 1e18
-    elif symbol == 'ucvxCRV':
-        ts = vault.totalSupply(block_identifier=block)
-        total_underlying = vault.totalUnderlying(block_identifier=block)
-        return total_underlying / ts
-
-
-
 def save_chart_data_to_cache(
     aprs_weekly,
     aprs_weekly_peg,
@@ -247,15 +367,13 @@ def save_chart_data_to_cache(
     aprs_since_peg,
     curve_gauge_data=None,
     treasury_balance_sheet=None,
+    publish=True,
 ):
     """
-    Save raw chart data and Curve gauge data to ll_info.json cache for use with Recharts
+    Save raw chart data and Curve gauge data to the cache store for use with Recharts.
+    Only the sections passed in are rewritten; the others keep their cached values.
+    With publish=False the /info payloads are left for the caller to rebuild.
     """
-    # Load existing cache
-    cache_data = utils.load_from_json('data/ll_info.json')
-    if not cache_data:
-        cache_data = {'ll_data': {}, 'last_updated': chain.time()}
-    
     # Convert datetime objects to ISO strings for JSON serialization
     def convert_data_for_json(data_list):
         converted = []
@@ -270,17 +388,22 @@ def save_chart_data_to_cache(
         return converted
     
     # Prepare chart data
-    chart_data = {
-        'weekly_aprs': convert_data_for_json(aprs_weekly),
-        'apr_since': convert_data_for_json(aprs_since[1:] if len(aprs_since) > 1 else aprs_since),
-        'last_updated': chain.time()
+    series = {
+        'weekly_aprs': aprs_weekly,
+        'weekly_aprs_peg': aprs_weekly_peg,
+        'apr_since': aprs_since[1:] if len(aprs_since) > 1 else aprs_since,
+        'apr_since_peg': aprs_since_peg[1:] if aprs_since_peg and len(aprs_since_peg) > 1 else aprs_since_peg,
     }
+    series = {key: rows for key, rows in series.items() if rows is not None}
+    chart_data = {key: convert_data_for_json(rows) for key, rows in series.items()}
+    chart_data['last_updated'] = chain.time()
     
     # Add chart data to cache
-    cache_data['chart_data'] = chart_data
+    store.write_section('chart_data', {'chart_data': chart_data})
+    save_chart_payloads(series)
 
     if treasury_balance_sheet:
-        cache_data['treasury_balance_sheet'] = treasury_balance_sheet
+        store.write_section('treasury', {'treasury_balance_sheet': treasury_balance_sheet})
         print(f"Treasury balance sheet added to cache at {datetime.now()}")
 
     # Add Curve gauge data to cache if available
@@ -310,18 +433,46 @@ def save_chart_data_to_cache(
                         'inflation_rate': inflation_rate
                     }
             
-            cache_data['curve_gauge_data'] = filtered_gauge_data
-            cache_data['curve_gauges_by_name'] = curve_gauges_by_name
-            cache_data['curve_gauge_data_last_updated'] = chain.time()
+            store.write_section('curve_gauges', {
+                'curve_gauge_data': filtered_gauge_data,
+                'curve_gauges_by_name': curve_gauges_by_name,
+                'curve_gauge_data_last_updated': chain.time(),
+            })
             print(f"Curve gauge data added to cache at {datetime.now()} (filtered out killed gauges)")
         else:
             # This is cached data, preserve existing timestamps and structure
             print(f"📋 Preserving existing cached Curve gauge data")
             # Don't update the timestamps since we're using old data
     
-    # Save updated cache
-    utils.cache_to_json('data/ll_info.json', cache_data)
-    print(f"Chart data saved to ll_info.json at {datetime.now()}")
+    # Pre-serialized and precompressed /info and treasury responses
+    if publish:
+        store.publish_info_payloads()
+    print(f"Chart data saved to cache store at {datetime.now()}")
+
+
+def build_chart_payload(rows):
+    """
+    Format APR samples the way Recharts consumes them: ms timestamps and percentages
+    """
+    symbols = [data['symbol'] for data in CURVE_LIQUID_LOCKER_COMPOUNDERS.values()]
+    payload = []
+    for row in rows:
+        item = {'date': int(row['date'].timestamp() * 1000)}
+        for symbol in symbols:
+            item[symbol] = float(row.get(symbol, 0)) * 100
+        payload.append(item)
+    return payload
+
+
+def save_chart_payloads(series):
+    """
+    Store one ready-to-serve payload per (chart_type, peg) that has data
+    """
+    for (chart_type, peg), key in CHART_SERIES.items():
+        if key not in series:
+            continue
+        body = store.dump_json_bytes(build_chart_payload(series[key]))
+        store.write_payload(f'chart_{chart_type}_{peg}', body)
 
 
 def cleanup_old_charts(older_than_days):
@@ -340,27 +491,8 @@ def cleanup_old_charts(older_than_days):
 
 
 def get_block_and_ts(ts):
-    block = closest_block_before_timestamp(ts)
-    return block, chain[block].timestamp
-
-
-def get_block_timestamp(height):
-    return chain[height].timestamp
-
-
-def closest_block_before_timestamp(timestamp: int) -> int:
-    height = chain.height
-    lo, hi = 0, height
-    while hi - lo > 1:
-        mid = lo + (hi - lo) // 2
-        if get_block_timestamp(mid) > timestamp:
-            hi = mid
-        else:
-            lo = mid
-    if get_block_timestamp(hi) < timestamp:
-        raise IndexError('timestamp is in the future')
-
-    return hi
+    block = block_index.closest_block_after_timestamp(ts)
+    return block, block_index.get_block_timestamp(block)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 from brownie import Contract, chain
 from compounders_info import CURVE_LIQUID_LOCKER_COMPOUNDERS
-import utils.utils as utils
+import utils.prices as prices
+import utils.store as store
+import utils.block_index as block_index
 
 DAY = 86400
 YEAR = 365 * DAY
@@ -34,8 +36,8 @@ def compare_concentrator():
     
     assert False
 
-def update_info():
-    crv_price = utils.get_prices([CRV])[CRV]
+def update_info(publish=True):
+    crv_price = prices.get_prices([CRV])[CRV]
     data = CURVE_LIQUID_LOCKER_COMPOUNDERS
 
     for compounder, info in data.items():
@@ -61,7 +63,11 @@ def update_info():
             'aprs_adjusted': aprs_adjusted
         })
 
-    utils.cache_to_json('data/ll_info.json', {'ll_data': data, 'last_updated': ts})
+    store.write_section('ll_data', {'ll_data': data, 'last_updated': ts})
+    # /info is served from the precompressed payload, so rebuild it with the
+    # new section unless the caller publishes once after writing more sections
+    if publish:
+        store.publish_info_payloads()
 
 def get_compounder_data(compounder, symbol):
     if symbol == 'ucvxCRV':
@@ -120,18 +126,5 @@ def get_pps(vault_address, block):
             return 0
 
 def get_block_and_ts(ts):
-    block = closest_block_before_timestamp(ts)
-    return block, chain[block].timestamp
-
-def get_block_timestamp(height):
-    return chain[height].timestamp
-
-def closest_block_before_timestamp(timestamp):
-    lo, hi = 0, chain.height
-    while hi - lo > 1:
-        mid = (lo + hi) // 2
-        if get_block_timestamp(mid) > timestamp:
-            hi = mid
-        else:
-            lo = mid
-    return hi if get_block_timestamp(hi) >= timestamp else lo
+    block = block_index.closest_block_after_timestamp(ts)
+    return block, block_index.get_block_timestamp(block)
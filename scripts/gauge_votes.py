@@ -0,0 +1,85 @@
+from brownie import Contract, chain, web3
+import os
+import utils.utils as utils
+import utils.vote_store as vote_store
+import utils.ens as ens
+import utils.call_cache as call_cache
+import utils.rpc_metrics as rpc_metrics
+from utils.multicall import Multicall
+from utils.concurrency import bounded_map, install_rate_limit
+
+GAUGE_CONTROLLER = '0x2F50D538606Fa9EDD2B11E2446BEb18C9D5846bB'
+PRECISION = 10 ** 18
+# Blocks of logs fetched and stored per batch, so an interrupted backfill resumes close to where it stopped
+INGEST_BATCH_BLOCKS = 500_000
+REFRESH_CONCURRENCY = int(os.getenv('REFRESH_CONCURRENCY', 8))
+RPC_RATE_LIMIT = float(os.getenv('RPC_RATE_LIMIT', 0))
+
+
+def main():
+    eth_call_cache = call_cache.install()
+    install_rate_limit(web3, RPC_RATE_LIMIT)
+    rpc = rpc_metrics.install()
+    con = vote_store.connect()
+    controller = Contract(GAUGE_CONTROLLER)
+    rpc_metrics.register_abi(controller.abi)
+
+    last = vote_store.last_block(con)
+    start = utils.contract_creation_block(GAUGE_CONTROLLER) if last is None else last + 1
+    end = chain.height
+    print(f"🗳️  Ingesting VoteForGauge events from block {start} to {end}")
+
+    while start <= end:
+        batch_end = min(end, start + INGEST_BATCH_BLOCKS - 1)
+        logs = utils.get_logs_chunked(controller, 'VoteForGauge', start, batch_end)
+        rows = build_vote_rows(controller, logs)
+        vote_store.insert_votes(con, rows)
+        print(f"✅ Stored {len(rows)} votes up to block {batch_end}")
+        start = batch_end + 1
+
+    vote_store.export_rollups(con, ens.get_store().names())
+    con.close()
+    print(f"✅ Exported gauge vote rollups to {vote_store.ROLLUP_DIR}")
+    print(f"eth_call cache: {eth_call_cache.stats()}")
+    print(f"RPC metrics written to {rpc.write('gauge_votes')}")
+
+
+def build_vote_rows(controller, logs):
+    """
+    One row per VoteForGauge log. amount is the veCRV the vote allocated: the
+    user's slope on the gauge times the time left until their lock ends, read
+    at the block of the vote.
+    """
+    by_block = {}
+    for log in logs:
+        by_block.setdefault(log.blockNumber, []).append(log)
+
+    def read_slopes(block):
+        multicall = Multicall(block)
+        for log in by_block[block]:
+            multicall.add(log.logIndex, controller, 'vote_user_slopes', log.args.user, log.args.gauge_addr, default=None)
+        return multicall.execute()
+
+    blocks = sorted(by_block)
+    slopes = dict(zip(blocks, bounded_map(read_slopes, blocks, REFRESH_CONCURRENCY)))
+
+    rows = []
+    for block in blocks:
+        for log in by_block[block]:
+            vote_time = log.args.time
+            slope = slopes[block][log.logIndex]
+            amount = 0.0
+            if slope is not None:
+                rate, _, lock_end = slope
+                amount = rate * max(lock_end - vote_time, 0) / PRECISION
+            rows.append((
+                block,
+                log.transactionHash.hex(),
+                log.logIndex,
+                vote_time,
+                log.args.user,
+                log.args.gauge_addr,
+                log.args.weight,
+                amount,
+            ))
+    return rows
@@ -1,11 +1,13 @@
-import os
 from decimal import Decimal
 from functools import lru_cache
-from pathlib import Path
 
-import requests
 from brownie import chain, web3
 
+import utils.prices as prices
+import utils.rpc_metrics as rpc_metrics
+import utils.token_list as token_list
+from utils.multicall import Multicall
+
 TREASURY = "0x6508eF65b0Bd57eaBD0f1D52685A70433B2d290B"
 COMMUNITY_FUND = "0xe3997288987E6297Ad550A69B31439504F513267"
 GRANTS_MULTISIG = "0xc420C9d507D0E038BD76383AaADCAd576ed0073c"
@@ -16,15 +18,12 @@ CRVUSD = "0xf939E0A03FB07F59A73314E73794Be0E57ac1b4E"
 SCRVUSD = "0x0655977FEb2f289A4aB78af67BAB0d17aAb84367"
 USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
 
-WAVEY_PRICE_API = "https://prices.wavey.info/v1/price"
-ENV_KEY_NAMES = (
-    "TOKEN_PRICE_AGG_KEY",
-    "TIDAL_DEPLOY_PRICE_API_KEY",
-    "FACTORY_DASHBOARD_DEPLOY_PRICE_API_KEY",
-)
-ENV_FILE_PATHS = (
-    Path(__file__).resolve().parents[1] / ".env",
-)
+WALLETS = [
+    ("Treasury", TREASURY),
+    ("Community Fund", COMMUNITY_FUND),
+    ("Grants Multisig", GRANTS_MULTISIG),
+]
+TOKENS = [CRV, CRVUSD, SCRVUSD, USDC]
 
 ERC20_ABI = [
     {
@@ -78,35 +77,9 @@ def decimal_to_string(value):
     return text or "0"
 
 
-def load_env_value_from_files(*keys):
-    for env_path in ENV_FILE_PATHS:
-        if not env_path.exists():
-            continue
-
-        values = {}
-        for line in env_path.read_text().splitlines():
-            stripped = line.strip()
-            if not stripped or stripped.startswith("#") or "=" not in stripped:
-                continue
-
-            key, value = stripped.split("=", 1)
-            values[key.strip()] = value.strip().strip("'\"")
-
-        for key in keys:
-            if values.get(key):
-                return values[key]
-
-    return None
-
-
-TOKEN_PRICE_AGG_KEY = next(
-    (os.getenv(key_name) for key_name in ENV_KEY_NAMES if os.getenv(key_name)),
-    None,
-) or load_env_value_from_files(*ENV_KEY_NAMES)
-
-
 @lru_cache(maxsize=None)
 def get_erc20_contract(token_address):
+    rpc_metrics.register_abi(ERC20_ABI)
     return web3.eth.contract(
         address=web3.to_checksum_address(token_address),
         abi=ERC20_ABI,
@@ -114,20 +87,59 @@ def get_erc20_contract(token_address):
 
 
 @lru_cache(maxsize=None)
-def get_token_metadata(token_address):
-    token = get_erc20_contract(token_address)
+def get_vest_receiver_contract():
+    rpc_metrics.register_abi(FLEXIBLE_VESTING_RECEIVER_ABI)
+    return web3.eth.contract(
+        address=web3.to_checksum_address(TREASURY_RETURN_VEST),
+        abi=FLEXIBLE_VESTING_RECEIVER_ABI,
+    )
+
+
+def read_treasury_snapshot(block_number, wallets, tokens):
+    """
+    Every on-chain read the sheet needs, sent as one Multicall3 aggregate
+    pinned to block_number so all balances come from the same state.
+    Returns token metadata, raw balances keyed by (wallet, token) and the
+    vest receiver's total_amount / available_limit.
+    """
+    multicall = Multicall(block_number, w3=web3)
+    for token_address in tokens:
+        token = get_erc20_contract(token_address)
+        multicall.add(("symbol", token_address), token, "symbol")
+        multicall.add(("decimals", token_address), token, "decimals")
+        for _, wallet_address in wallets:
+            multicall.add(
+                ("balance", wallet_address, token_address),
+                token,
+                "balanceOf",
+                web3.to_checksum_address(wallet_address),
+            )
+    vest_receiver = get_vest_receiver_contract()
+    multicall.add("vest_total_amount", vest_receiver, "total_amount")
+    multicall.add("vest_available_limit", vest_receiver, "available_limit")
+    results = multicall.execute()
+
     return {
-        "symbol": token.functions.symbol().call(),
-        "decimals": token.functions.decimals().call(),
+        "metadata": {
+            token_address: {
+                "symbol": results[("symbol", token_address)],
+                "decimals": results[("decimals", token_address)],
+            }
+            for token_address in tokens
+        },
+        "balances": {
+            (wallet_address, token_address): results[("balance", wallet_address, token_address)]
+            for _, wallet_address in wallets
+            for token_address in tokens
+        },
+        "vest_total_amount": results["vest_total_amount"],
+        "vest_available_limit": results["vest_available_limit"],
     }
 
 
-def get_wallet_token_data(wallet_address, token_address):
-    token = get_erc20_contract(token_address)
-    metadata = get_token_metadata(token_address)
-    raw_balance = token.functions.balanceOf(
-        web3.to_checksum_address(wallet_address)
-    ).call()
+def get_wallet_token_data(snapshot, wallet_address, token_address):
+    metadata = snapshot["metadata"][token_address]
+    raw_balance = snapshot["balances"][(wallet_address, token_address)]
     decimals = Decimal(10) ** metadata["decimals"]
     balance = Decimal(raw_balance) / decimals
 
@@ -139,51 +151,40 @@ def get_wallet_token_data(wallet_address, token_address):
     }
 
 
-def fetch_price_snapshot(token_address, chain_id=1):
-    headers = {}
-    if TOKEN_PRICE_AGG_KEY:
-        headers["Authorization"] = f"Bearer {TOKEN_PRICE_AGG_KEY}"
-
-    response = requests.get(
-        WAVEY_PRICE_API,
-        params={"token": token_address, "chain_id": chain_id},
-        headers=headers,
-        timeout=30,
-    )
-    payload = response.json()
-
-    if response.ok and payload.get("summary"):
-        summary = payload["summary"]
-        selected_price = (payload.get("price_data") or {}).get("price")
-        price = summary.get("median_price") or selected_price
-        if price is not None:
-            logo_url = (payload.get("token") or {}).get("logo_url") or ""
-            return {
-                "price": Decimal(str(price)),
-                "logo_url": logo_url,
-            }
+def fetch_price_snapshots(tokens):
+    # Wavey carries the logo URLs the sheet shows, DefiLlama covers what it misses
+    snapshots = prices.get_price_snapshots(tokens, sources=("wavey", "defillama"))
+    missing = [token for token in tokens if token not in snapshots]
+    if missing:
+        raise ValueError(f"Price lookup failed for {', '.join(missing)}")
+    return snapshots
 
-    raise ValueError(f"Price lookup failed for {token_address}: {payload}")
 
-
-def get_treasury_crv_return_from_vest():
-    vest_receiver = web3.eth.contract(
-        address=web3.to_checksum_address(TREASURY_RETURN_VEST),
-        abi=FLEXIBLE_VESTING_RECEIVER_ABI,
-    )
-    total_amount = Decimal(
-        vest_receiver.functions.total_amount().call()
-    ) / Decimal(10**18)
-    available_limit = Decimal(
-        vest_receiver.functions.available_limit().call()
-    ) / Decimal(10**18)
+def get_treasury_crv_return_from_vest(snapshot):
+    total_amount = Decimal(snapshot["vest_total_amount"]) / Decimal(10**18)
+    available_limit = Decimal(snapshot["vest_available_limit"]) / Decimal(10**18)
     # Governance updates can raise the available limit to the full vest amount.
     # Once that happens, nothing remains earmarked to return to the DAO.
     return max(total_amount - available_limit, Decimal("0"))
 
 
-def build_balance_row(label, token_address, balance, price_snapshot, raw_balance, kind="token"):
-    metadata = get_token_metadata(token_address)
+def add_token_logo(token_address, price_snapshot):
+    """
+    Fill in the logo from the token list when the price source had none, and
+    keep a local copy under cache/token-logos/ for the Flask app to serve.
+    """
+    logo_url = price_snapshot.get("logo_url")
+    if not logo_url:
+        try:
+            logo_url = token_list.get_logo_url(token_address)
+        except Exception as e:
+            print(f"❌ Token list unavailable: {e}")
+            logo_url = ""
+    price_snapshot["logo_url"] = logo_url
+    price_snapshot["logo_path"] = token_list.cache_logo(token_address, logo_url=logo_url) or ""
+
+
+def build_balance_row(label, token_address, metadata, balance, price_snapshot, raw_balance, kind="token"):
     unit_price = price_snapshot["price"]
     usd_value = balance * unit_price
     return {
@@ -192,6 +193,7 @@ def build_balance_row(label, token_address, balance, price_snapshot, raw_balance
         "token_address": web3.to_checksum_address(token_address),
         "kind": kind,
         "logo_url": price_snapshot.get("logo_url", ""),
+        "logo_path": price_snapshot.get("logo_path", ""),
         "raw_balance": raw_balance,
         "balance": decimal_to_string(balance),
         "unit_price": decimal_to_string(unit_price),
@@ -201,15 +203,12 @@ def build_balance_row(label, token_address, balance, price_snapshot, raw_balance
 
 def build_treasury_balance_sheet():
     latest_block = web3.eth.get_block("latest")
-    wallets = [
-        ("Treasury", TREASURY),
-        ("Community Fund", COMMUNITY_FUND),
-        ("Grants Multisig", GRANTS_MULTISIG),
-    ]
-    tokens = [CRV, CRVUSD, SCRVUSD, USDC]
-    price_snapshots = {
-        token: fetch_price_snapshot(token) for token in tokens
-    }
+    wallets = WALLETS
+    tokens = TOKENS
+    snapshot = read_treasury_snapshot(latest_block["number"], wallets, tokens)
+    price_snapshots = fetch_price_snapshots(tokens)
+    for token in tokens:
+        add_token_logo(token, price_snapshots[token])
 
     wallet_rows = []
     grand_total = Decimal("0")
@@ -219,13 +218,14 @@ def build_treasury_balance_sheet():
         detail_rows = []
 
         for token_address in tokens:
-            token_data = get_wallet_token_data(wallet_address, token_address)
+            token_data = get_wallet_token_data(snapshot, wallet_address, token_address)
             if token_data["balance"] <= 0:
                 continue
 
             row, usd_value = build_balance_row(
                 label=token_data["symbol"],
                 token_address=token_address,
+                metadata=snapshot["metadata"][token_address],
                 balance=token_data["balance"],
                 price_snapshot=price_snapshots[token_address],
                 raw_balance=token_data["raw_balance"],
@@ -234,12 +234,13 @@ def build_treasury_balance_sheet():
             grand_total += usd_value
 
         if wallet_name == "Community Fund":
-            vest_return_balance = get_treasury_crv_return_from_vest()
+            vest_return_balance = get_treasury_crv_return_from_vest(snapshot)
             if vest_return_balance > 0:
                 vest_return_active = True
                 row, usd_value = build_balance_row(
                     label="*CRV (vest return)",
                     token_address=CRV,
+                    metadata=snapshot["metadata"][CRV],
                     balance=vest_return_balance,
                     price_snapshot=price_snapshots[CRV],
                     raw_balance=str(int(vest_return_balance * Decimal(10**18))),
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test block-by-timestamp lookups of the block index against a synthetic chain
+"""
+
+import bisect
+import importlib
+import random
+
+import pytest
+
+HEIGHT = 200_000
+
+
+def block_timestamp(block):
+    # 8 to 16 seconds apart, so lookups cannot compute the block directly
+    return 1_600_000_000 + block * 12 + (block * 7919) % 9 - 4
+
+
+TIMESTAMPS = [block_timestamp(block) for block in range(HEIGHT + 1)]
+
+
+class Chain:
+    def __init__(self):
+        self.requests = 0
+
+    def timestamp(self, block):
+        self.requests += 1
+        return TIMESTAMPS[block]
+
+
+@pytest.fixture
+def block_index(node):
+    # utils.block_index imports brownie
+    return importlib.import_module('utils.block_index')
+
+
+def test_lookups_match_a_bisect_reference(block_index, tmp_path):
+    chain = Chain()
+    index = block_index.BlockIndex(str(tmp_path / 'blocks.csv'), chain.timestamp, lambda: HEIGHT)
+    rng = random.Random(5)
+    targets = [rng.randrange(TIMESTAMPS[0], TIMESTAMPS[-1]) for _ in range(300)]
+    # Exact block timestamps and their neighbours are the edge cases
+    targets += [TIMESTAMPS[block] + offset for block in (0, 1, 7_777, HEIGHT - 1) for offset in (-1, 0)]
+
+    for target in targets:
+        assert index.block_after(target) == bisect.bisect_right(TIMESTAMPS, target), target
+    assert index.block_after(TIMESTAMPS[-1]) == HEIGHT
+    with pytest.raises(IndexError):
+        index.block_after(TIMESTAMPS[-1] + 1)
+    # Interpolation settles in a few requests per lookup
+    assert chain.requests < 8 * len(targets)
+    assert index.rpc_count == chain.requests
+
+
+def test_only_finalized_blocks_are_persisted(block_index, tmp_path):
+    path = str(tmp_path / 'blocks.csv')
+    index = block_index.BlockIndex(path, Chain().timestamp, lambda: HEIGHT)
+    index.blocks_after([TIMESTAMPS[1_000], TIMESTAMPS[HEIGHT - 10]])
+
+    with open(path) as file:
+        persisted = [int(line.split(',')[0]) for line in file]
+    assert persisted
+    assert max(persisted) <= HEIGHT - block_index.FINALITY_DEPTH
+    assert set(index.blocks) - set(persisted)
+
+    # A reopened index answers lookups it already made from the file alone
+    chain = Chain()
+    reopened = block_index.BlockIndex(path, chain.timestamp, lambda: HEIGHT)
+    assert reopened.blocks == sorted(persisted)
+    assert reopened.block_after(TIMESTAMPS[1_000]) == 1_001
+    assert chain.requests == 1  # the head, which is never persisted
+
+
+def test_torn_last_line_is_skipped(block_index, tmp_path):
+    path = tmp_path / 'blocks.csv'
+    path.write_text(f'10,{TIMESTAMPS[10]}\n20,{TIMESTAMPS[20]}\n30,')
+    index = block_index.BlockIndex(str(path), Chain().timestamp, lambda: HEIGHT)
+    assert index.blocks == [10, 20]
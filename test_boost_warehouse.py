@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test incremental refreshes of the DuckDB boost warehouse
+"""
+
+import pytest
+
+import utils.boost_warehouse as boost_warehouse
+
+pytest.importorskip('duckdb')
+
+
+def record(i, amount=1):
+    return {
+        'account': f'0x{i:040x}',
+        'receiver': f'0x{i + 1:040x}',
+        'boost_delegate': f'0x{i + 2:040x}',
+        'amount': amount,
+        'block': 15_000_000 + i,
+    }
+
+
+class FakeResponse:
+    def __init__(self, records, etag, status_code=200):
+        self.records = records
+        self.status_code = status_code
+        self.headers = {'ETag': etag, 'Last-Modified': 'Wed, 01 Oct 2025 00:00:00 GMT'}
+
+    def json(self):
+        return {'data': self.records}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeBoostData:
+    """The published boost file, answering conditional GETs with 304"""
+
+    def __init__(self):
+        self.records = []
+        self.version = 0
+        self.requests = []
+
+    def publish(self, records):
+        self.records = records
+        self.version += 1
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        etag = f'"{self.version}"'
+        if (headers or {}).get('If-None-Match') == etag:
+            return FakeResponse(None, etag, status_code=304)
+        return FakeResponse(list(self.records), etag)
+
+
+@pytest.fixture
+def boost_data(monkeypatch):
+    boost_data = FakeBoostData()
+    monkeypatch.setattr(boost_warehouse.requests, 'get', boost_data.get)
+    return boost_data
+
+
+def stored(con):
+    return con.execute('SELECT block, amount FROM boost_data ORDER BY block').fetchall()
+
+
+def test_growing_file_appends_only_new_records(boost_data, tmp_path):
+    con = boost_warehouse.connect(str(tmp_path / 'boost.duckdb'))
+    boost_data.publish([record(i) for i in range(5)])
+    assert boost_warehouse.refresh(con) == 5
+
+    boost_data.publish([record(i) for i in range(8)])
+    assert boost_warehouse.refresh(con) == 3
+    assert [block for block, _ in stored(con)] == [15_000_000 + i for i in range(8)]
+    assert boost_data.requests[-1]['If-None-Match'] == '"1"'
+
+
+def test_unchanged_file_costs_a_304(boost_data, tmp_path):
+    con = boost_warehouse.connect(str(tmp_path / 'boost.duckdb'))
+    boost_data.publish([record(i) for i in range(5)])
+    boost_warehouse.refresh(con)
+
+    assert boost_warehouse.refresh(con) == 0
+    assert boost_data.requests[-1]['If-None-Match'] == '"1"'
+    assert len(stored(con)) == 5
+
+
+def test_rewritten_file_rebuilds_the_table(boost_data, tmp_path):
+    con = boost_warehouse.connect(str(tmp_path / 'boost.duckdb'))
+    boost_data.publish([record(i) for i in range(5)])
+    boost_warehouse.refresh(con)
+
+    # Same length and more, but the last stored record changed
+    rewritten = [record(i) for i in range(4)] + [record(4, amount=2)] + [record(5)]
+    boost_data.publish(rewritten)
+    assert boost_warehouse.refresh(con) == 6
+    assert stored(con) == [(15_000_000 + i, 2 if i == 4 else 1) for i in range(6)]
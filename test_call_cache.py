@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test the on-disk eth_call cache: finality, LRU eviction and the middleware
+"""
+
+import importlib
+import itertools
+import types
+
+import pytest
+
+VAULT = '0x27B5739e22ad9033bcBf192059122d163b60349D'
+HEAD = 1_000
+FINALITY_DEPTH = 64
+CALLDATA = '0x99530b06'
+
+
+@pytest.fixture
+def call_cache(node, monkeypatch):
+    # utils.call_cache imports brownie through utils.block_index
+    module = importlib.import_module('utils.call_cache')
+    # A strictly increasing clock, so last-used order is unambiguous
+    clock = itertools.count(1_000_000)
+    monkeypatch.setattr(module.time, 'time', lambda: float(next(clock)))
+    return module
+
+
+def fake_w3():
+    return types.SimpleNamespace(eth=types.SimpleNamespace(block_number=HEAD, chain_id=1))
+
+
+class Upstream:
+    """The rest of the middleware chain: counts eth_calls and answers them"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, method, params):
+        self.calls += 1
+        return {'jsonrpc': '2.0', 'id': 0, 'result': '0x' + f'{params[1]}'.encode().hex()}
+
+
+def call(request, block):
+    return request('eth_call', [{'to': VAULT, 'data': CALLDATA}, hex(block)])
+
+
+def test_only_finalized_blocks_are_cached(call_cache, tmp_path):
+    cache = call_cache.CallCache(str(tmp_path / 'calls.sqlite'), finality_depth=FINALITY_DEPTH)
+    upstream = Upstream()
+    request = call_cache.call_cache_middleware(cache)(upstream, fake_w3())
+
+    final = HEAD - FINALITY_DEPTH
+    for block in (final, final, final + 1, final + 1):
+        call(request, block)
+
+    # The finalized block is fetched once; the one above it every time
+    assert upstream.calls == 3
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    assert cache.conn.execute('SELECT block FROM eth_calls').fetchall() == [(final,)]
+
+
+def test_middleware_counts_hits_and_misses(call_cache, tmp_path):
+    cache = call_cache.CallCache(str(tmp_path / 'calls.sqlite'), finality_depth=FINALITY_DEPTH)
+    upstream = Upstream()
+    request = call_cache.call_cache_middleware(cache)(upstream, fake_w3())
+
+    first = [call(request, block) for block in (10, 11, 12)]
+    second = [call(request, block) for block in (10, 11, 12, 13)]
+
+    assert second[:3] == first
+    assert upstream.calls == 4
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (3, 4)
+    assert stats['hit_rate'] == 3 / 7
+    # Methods other than eth_call pass straight through
+    request('eth_getBalance', [VAULT, 'latest'])
+    assert upstream.calls == 5
+    assert cache.stats()['misses'] == 4
+
+
+def test_eviction_drops_least_recently_used_to_fraction_of_cap(call_cache, tmp_path):
+    result = '0x' + '00' * 100
+    size = len(call_cache.CallCache.key(1, VAULT, CALLDATA, 0)) + len(result)
+    cache = call_cache.CallCache(str(tmp_path / 'calls.sqlite'), max_bytes=10 * size)
+
+    keys = [call_cache.CallCache.key(1, VAULT, CALLDATA, block) for block in range(11)]
+    for block, key in enumerate(keys[:10]):
+        cache.put(key, 1, VAULT, block, result)
+    # Reading the oldest entry makes it the most recently used
+    assert cache.get(keys[0]) == result
+    cache.put(keys[10], 1, VAULT, 10, result)
+
+    assert cache.total_bytes <= 10 * size * call_cache.EVICT_TO_FRACTION
+    assert cache.evictions == 2
+    assert cache.get(keys[0]) == result
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is None
+    assert cache.get(keys[3]) == result
+    stored = cache.conn.execute('SELECT COALESCE(SUM(size), 0) FROM eth_calls').fetchone()[0]
+    assert stored == cache.total_bytes
+
+
+def test_key_and_stored_address_are_lowercased(call_cache, tmp_path):
+    cache = call_cache.CallCache(str(tmp_path / 'calls.sqlite'))
+    key = cache.key(1, VAULT, CALLDATA.upper().replace('0X', '0x'), 5)
+
+    assert key == cache.key(1, VAULT.lower(), CALLDATA, 5)
+    cache.put(key, 1, VAULT, 5, '0x01')
+    assert cache.conn.execute('SELECT address FROM eth_calls').fetchall() == [(VAULT.lower(),)]
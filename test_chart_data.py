@@ -3,24 +3,23 @@
 Test script to verify chart data caching functionality
 """
 
-import json
 import os
 from datetime import datetime
+import utils.store as store
 
 def test_chart_data_cache():
-    """Test if chart data is properly cached in ll_info.json"""
+    """Test if chart data is properly cached in the cache store"""
     
-    # Check if ll_info.json exists
-    if not os.path.exists('data/ll_info.json'):
-        print("❌ data/ll_info.json not found")
+    # Check if the store manifest exists
+    if not os.path.exists(store.manifest_path()):
+        print(f"❌ {store.manifest_path()} not found")
         return False
     
     # Load the cache
     try:
-        with open('data/ll_info.json', 'r') as f:
-            cache_data = json.load(f)
+        cache_data = store.read_all()
     except Exception as e:
-        print(f"❌ Error loading ll_info.json: {e}")
+        print(f"❌ Error loading cache store: {e}")
         return False
     
     # Check if chart_data exists
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the persistent ENS store: TTLs, the legacy import and resuming
+"""
+
+import json
+import os
+
+import utils.ens as ens
+from utils.ens import NEGATIVE_TTL, POSITIVE_TTL, EnsStore
+
+NAMED = '0x5f350bF5feE8e254D6077f8661E9C7B83a30364e'
+UNNAMED = '0xFEB4acf3df3cDEA7399794D0869ef76A6EfAff52'
+
+
+def test_negative_entries_expire_before_positive_ones(tmp_path):
+    store = EnsStore(str(tmp_path / 'ens.sqlite'))
+    store.put_many([(NAMED, 'wavey.eth'), (UNNAMED, None)], resolved_at=1_000)
+
+    assert store.is_fresh(NAMED.lower(), now=1_000 + NEGATIVE_TTL - 1)
+    assert store.is_fresh(UNNAMED, now=1_000 + NEGATIVE_TTL - 1)
+    assert not store.is_fresh(UNNAMED, now=1_000 + NEGATIVE_TTL)
+    assert store.is_fresh(NAMED, now=1_000 + NEGATIVE_TTL)
+    assert not store.is_fresh(NAMED, now=1_000 + POSITIVE_TTL)
+    assert store.lookup(NAMED.upper().replace('0X', '0x')) == 'wavey.eth'
+    assert store.lookup(UNNAMED) == ''
+    assert store.names() == {NAMED.lower(): 'wavey.eth'}
+
+
+def test_legacy_cache_is_imported_once(tmp_path):
+    legacy = tmp_path / 'ens_cache.json'
+    legacy.write_text(json.dumps({NAMED: 'wavey.eth', UNNAMED: ''}))
+    os.utime(legacy, (5_000, 5_000))
+    path = str(tmp_path / 'ens.sqlite')
+
+    store = EnsStore(path)
+    store.migrate_legacy(str(legacy))
+    assert store.entries == {NAMED.lower(): ('wavey.eth', 5_000), UNNAMED.lower(): ('', 5_000)}
+
+    # Reopened, the store keeps its rows and skips a changed legacy file
+    legacy.write_text(json.dumps({NAMED: 'other.eth'}))
+    reopened = EnsStore(path)
+    reopened.migrate_legacy(str(legacy))
+    assert reopened.lookup(NAMED) == 'wavey.eth'
+    assert len(reopened.entries) == 2
+
+
+def test_interrupted_resolve_resumes_after_the_last_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(ens, 'CHECKPOINT_EVERY', 10)
+    addresses = [f'0x{i:040x}' for i in range(1, 26)]
+    path = str(tmp_path / 'ens.sqlite')
+    asked = []
+
+    def failing_after_first_checkpoint(address):
+        asked.append(address)
+        if len(asked) > 10:
+            raise KeyboardInterrupt
+        return f'name{int(address, 16)}.eth' if int(address, 16) % 2 else ''
+
+    try:
+        ens.resolve(addresses, failing_after_first_checkpoint, EnsStore(path), max_workers=1)
+    except KeyboardInterrupt:
+        pass
+
+    asked.clear()
+    store = EnsStore(path)
+    resolved = ens.resolve(addresses, lambda address: asked.append(address) or '', store, max_workers=1)
+
+    # The first checkpoint's ten addresses, named or not, are not asked again
+    assert asked == addresses[10:]
+    assert resolved == 15
+    assert store.lookup(addresses[0]) == 'name1.eth'
+    assert store.lookup(addresses[1]) == ''
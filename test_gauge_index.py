@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test ranking and lookups of the gauge search index
+"""
+
+from utils.gauge_index import GaugeSearchIndex
+
+YCRV_GAUGE = '0x5980d25B4947594c26255C0BF663231E7CA4f6b0'
+CRVUSD_GAUGE = '0x95f00391cB5EebCd190EB58728B4CE23DbFa6ac1'
+
+GAUGES = {
+    YCRV_GAUGE: {
+        'name': 'yCRV/CRV',
+        'shortName': 'yCRV/CRV (0x9938…)',
+        'swap': '0x99f5aCc8EC2Da2BC0771c32814EFF52b712de1E5',
+        'gaugeCrvApy': [1.5, 3.75],
+        'gauge_controller': {'gauge_relative_weight': '2000'},
+    },
+    CRVUSD_GAUGE: {
+        'name': 'Curve.fi Factory Plain Pool: crvUSD/USDC',
+        'shortName': 'crvUSD/USDC (0x4dec…)',
+        'swap': '0x4DEcE678ceceb27446b35C672dC7d61F30bAD69E',
+        'gauge_controller': {'gauge_relative_weight': '9000'},
+    },
+}
+
+
+def test_search_ranks_exact_then_prefix_then_fuzzy():
+    index = GaugeSearchIndex(GAUGES)
+
+    assert index.search('ycrv/crv')[0]['gauge_address'] == YCRV_GAUGE
+    assert index.search('ycrv/crv')[0]['score'] == 100
+    assert [r['gauge_address'] for r in index.search('crvusd usdc')] == [CRVUSD_GAUGE]
+    assert index.search('0x4dece6')[0]['gauge_address'] == CRVUSD_GAUGE
+    # A typo still finds the gauge through trigrams
+    assert index.search('crvsud')[0]['gauge_address'] == CRVUSD_GAUGE
+    assert index.search('   ') == []
+
+
+def test_get_maps_curve_fields():
+    details = GaugeSearchIndex(GAUGES).get(YCRV_GAUGE.lower())
+
+    assert details['pool_address'] == GAUGES[YCRV_GAUGE]['swap']
+    assert details['curve_key'] == 'yCRV/CRV'
+    assert details['apy_data']['gauge_crv_apy'] == {'min_boost': 1.5, 'max_boost': 3.75}
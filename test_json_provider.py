@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Test the orjson-backed JSON provider on values orjson cannot encode itself
+"""
+
+import decimal
+import json
+
+from flask import Flask
+
+from utils.json_provider import FastJSONProvider, dumps_bytes
+
+STAKE = 10 ** 20
+
+
+def test_ints_wider_than_64_bits_are_serialized_exactly():
+    payload = {'user_stake_map': {'0xabc': STAKE}, 'profit': decimal.Decimal('1.50'), 1: [STAKE, -STAKE]}
+
+    body = dumps_bytes(payload)
+    assert json.loads(body) == {'user_stake_map': {'0xabc': STAKE}, 'profit': '1.50', '1': [STAKE, -STAKE]}
+    assert b'100000000000000000000' in body
+
+
+def test_response_with_a_wide_int_is_served():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    @app.route('/stakes')
+    def stakes():
+        return {'global_stake_map': {'0xabc': STAKE}}
+
+    response = app.test_client().get('/stakes')
+    assert response.status_code == 200
+    assert json.loads(response.get_data()) == {'global_stake_map': {'0xabc': STAKE}}
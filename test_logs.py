@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the adaptive log fetcher against a provider that caps range size
+"""
+
+import threading
+
+import utils.logs as logs_module
+from utils.logs import iter_logs
+
+LOG_BLOCKS = list(range(0, 10_000, 7))
+
+
+class FakeProvider:
+    """Rejects ranges wider than max_span, like a node's getLogs limit"""
+
+    def __init__(self, max_span):
+        self.max_span = max_span
+        self.lock = threading.Lock()
+        self.rejected = 0
+
+    def get_logs(self, from_block, to_block):
+        if to_block - from_block + 1 > self.max_span:
+            with self.lock:
+                self.rejected += 1
+            raise ValueError({'code': -32005, 'message': 'query returned more than 10000 results'})
+        return [{'blockNumber': b} for b in LOG_BLOCKS if from_block <= b <= to_block]
+
+
+class RateLimitedProvider:
+    """Answers each range only on its second request, like a node shedding load"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = []
+
+    def get_logs(self, from_block, to_block):
+        with self.lock:
+            self.requests.append((from_block, to_block))
+            first = self.requests.count((from_block, to_block)) == 1
+        if first:
+            raise ValueError('429 Client Error: Too Many Requests for url: https://rpc.example')
+        return [{'blockNumber': b} for b in LOG_BLOCKS if from_block <= b <= to_block]
+
+
+def test_logs_come_back_in_order_after_splitting():
+    provider = FakeProvider(max_span=1_500)
+    logs = list(iter_logs(provider.get_logs, 0, 9_999, chunk_size=8_000, max_workers=4))
+
+    assert [log['blockNumber'] for log in logs] == LOG_BLOCKS
+    assert provider.rejected > 0
+
+
+def test_checkpoint_resumes_after_consumed_logs(tmp_path):
+    checkpoint = str(tmp_path / 'checkpoint.json')
+    provider = FakeProvider(max_span=10_000)
+
+    first = iter_logs(provider.get_logs, 0, 9_999, chunk_size=1_000, max_workers=2, checkpoint_path=checkpoint)
+    # Stop partway through; only fully consumed ranges are checkpointed
+    seen = [next(first)['blockNumber'] for _ in range(300)]
+    first.close()
+
+    rest = [log['blockNumber'] for log in iter_logs(provider.get_logs, 0, 9_999, checkpoint_path=checkpoint)]
+    # Nothing after the last consumed log is skipped, at worst a range is re-read
+    assert rest[0] <= seen[-1] + 7
+    assert rest[0] > 0
+    assert sorted(set(seen + rest)) == LOG_BLOCKS
+
+
+def test_rate_limited_ranges_are_retried_without_splitting(monkeypatch):
+    monkeypatch.setattr(logs_module, 'RETRY_BACKOFF_SECONDS', 0)
+    provider = RateLimitedProvider()
+    logs = list(iter_logs(provider.get_logs, 0, 9_999, chunk_size=2_500, max_workers=2))
+
+    assert [log['blockNumber'] for log in logs] == LOG_BLOCKS
+    assert all(hi - lo + 1 >= 2_500 for lo, hi in provider.requests)
+    assert len(provider.requests) == 2 * len(set(provider.requests))
+
+
+def test_checkpoint_from_another_start_block_is_ignored(tmp_path):
+    checkpoint = str(tmp_path / 'checkpoint.json')
+    provider = FakeProvider(max_span=10_000)
+    list(iter_logs(provider.get_logs, 5_000, 9_999, checkpoint_path=checkpoint))
+
+    logs = [log['blockNumber'] for log in iter_logs(provider.get_logs, 0, 9_999, checkpoint_path=checkpoint)]
+    assert logs == LOG_BLOCKS
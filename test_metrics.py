@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Test the shared counters, histograms and Prometheus exposition
+"""
+
+from utils.metrics import Metrics, to_prometheus
+
+
+def test_histogram_buckets_are_cumulative_in_exposition():
+    metrics = Metrics()
+    for seconds in (0.003, 0.02, 0.02, 7.0, 30.0):
+        metrics.observe('request_seconds', seconds, buckets=(0.01, 0.1, 10.0), route='/info')
+    metrics.inc('requests_total', route='/info', status='200')
+
+    text = to_prometheus(metrics.snapshot(), {'requests_total': 'Requests served'})
+    lines = text.splitlines()
+    assert '# HELP requests_total Requests served' in lines
+    assert '# TYPE request_seconds histogram' in lines
+    assert 'requests_total{route="/info",status="200"} 1' in lines
+    assert 'request_seconds_bucket{route="/info",le="0.01"} 1' in lines
+    assert 'request_seconds_bucket{route="/info",le="0.1"} 3' in lines
+    assert 'request_seconds_bucket{route="/info",le="10"} 4' in lines
+    assert 'request_seconds_bucket{route="/info",le="+Inf"} 5' in lines
+    assert 'request_seconds_count{route="/info"} 5' in lines
+
+
+def test_snapshots_from_several_processes_add_up():
+    workers = [Metrics(), Metrics()]
+    for worker in workers:
+        worker.inc('requests_total', route='/info')
+        worker.observe('request_seconds', 0.2, route='/info')
+
+    merged = Metrics()
+    for worker in workers:
+        merged.merge(worker.snapshot())
+
+    snapshot = merged.snapshot()
+    assert snapshot['counters'] == [['requests_total', {'route': '/info'}, 2]]
+    [[_, _, histogram]] = snapshot['histograms']
+    assert histogram['count'] == 2
+    assert histogram['sum'] == 0.4
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test Multicall batching against a local stand-in node
+"""
+
+import pytest
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector
+
+from utils.multicall import AGGREGATE3_SELECTOR, MULTICALL3, Multicall
+
+VAULT = '0x27B5739e22ad9033bcBf192059122d163b60349D'
+POOL = '0x99f5aCc8EC2Da2BC0771c32814EFF52b712de1E5'
+
+
+class FakeMethod:
+    """Mimics a brownie ContractCall: encode_input / decode_output"""
+
+    def __init__(self, signature, input_types, output_type):
+        self.selector = function_signature_to_4byte_selector(signature)
+        self.input_types = input_types
+        self.output_type = output_type
+
+    def encode_input(self, *args):
+        return '0x' + (self.selector + encode(self.input_types, args)).hex()
+
+    def decode_output(self, hexstr):
+        return decode([self.output_type], bytes.fromhex(hexstr[2:]))[0]
+
+
+class FakeContract:
+    def __init__(self, address, **methods):
+        self.address = address
+        for name, method in methods.items():
+            setattr(self, name, method)
+
+
+class FakeNode:
+    """Answers aggregate3 eth_calls from per-block state; reverts are failed calls"""
+
+    def __init__(self, handlers):
+        self.handlers = handlers
+        self.calls = []
+        self.eth = self
+
+    def call(self, tx, block_identifier):
+        self.calls.append(block_identifier)
+        data = bytes.fromhex(tx['data'][2:])
+        assert tx['to'] == MULTICALL3
+        assert data[:4] == AGGREGATE3_SELECTOR
+        results = []
+        for target, _, calldata in decode(['(address,bool,bytes)[]'], data[4:])[0]:
+            handler = self.handlers.get((target.lower(), calldata[:4]))
+            value = handler(block_identifier, calldata[4:]) if handler else None
+            if value is None:
+                results.append((False, b''))
+            else:
+                results.append((True, encode(['uint256'], [value])))
+        return encode(['(bool,bytes)[]'], [results])
+
+
+def test_multicall_batches_block_reads():
+    price_per_share = FakeMethod('pricePerShare()', [], 'uint256')
+    convert = FakeMethod('convertToAssets(uint256)', ['uint256'], 'uint256')
+    get_dy = FakeMethod('get_dy(int128,int128,uint256)', ['int128', 'int128', 'uint256'], 'uint256')
+    vault = FakeContract(VAULT, pricePerShare=price_per_share, convertToAssets=convert)
+    pool = FakeContract(POOL, get_dy=get_dy)
+
+    node = FakeNode({
+        (VAULT.lower(), price_per_share.selector): lambda block, _: 10**18 + block,
+        (POOL.lower(), get_dy.selector): lambda block, args: decode(['int128', 'int128', 'uint256'], args)[2] // 2,
+        # convertToAssets always reverts on this node
+    })
+
+    batch = Multicall(block_identifier=100, w3=node)
+    batch.add('pps', vault, 'pricePerShare')
+    batch.add('peg', pool, 'get_dy', 1, 0, 10**22)
+    batch.add('assets', vault, 'convertToAssets', 10**18, default=0)
+    results = batch.execute()
+
+    assert node.calls == [100]
+    assert results == {'pps': 10**18 + 100, 'peg': 5 * 10**21, 'assets': 0}
+
+
+def test_multicall_returns_default_none_for_optional_failures():
+    price_per_share = FakeMethod('pricePerShare()', [], 'uint256')
+    convert = FakeMethod('convertToAssets(uint256)', ['uint256'], 'uint256')
+    vault = FakeContract(VAULT, pricePerShare=price_per_share, convertToAssets=convert)
+    node = FakeNode({
+        (VAULT.lower(), price_per_share.selector): lambda block, _: 10**18,
+        # The vault has no assets before block 50, so convertToAssets reverts
+        (VAULT.lower(), convert.selector): lambda block, args: 10**18 + block if block >= 50 else None,
+    })
+
+    results = {}
+    for block in (10, 100):
+        batch = Multicall(block_identifier=block, w3=node)
+        batch.add('pps', vault, 'pricePerShare')
+        batch.add('assets', vault, 'convertToAssets', 10**18, default=None)
+        results[block] = batch.execute()
+
+    # A revert is told apart from a zero result, so callers can skip the window
+    assert results[10] == {'pps': 10**18, 'assets': None}
+    assert results[100] == {'pps': 10**18, 'assets': 10**18 + 100}
+
+
+def test_multicall_raises_for_required_failures():
+    convert = FakeMethod('convertToAssets(uint256)', ['uint256'], 'uint256')
+    vault = FakeContract(VAULT, convertToAssets=convert)
+
+    batch = Multicall(block_identifier=100, w3=FakeNode({}))
+    batch.add('assets', vault, 'convertToAssets', 10**18)
+    with pytest.raises(ValueError, match='convertToAssets'):
+        batch.execute()
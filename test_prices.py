@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test source preference and the stale fallback of the price cache
+"""
+
+import time
+from decimal import Decimal
+
+import utils.prices as prices
+
+TOKEN = '0xFCc5c47bE19d06BF83eB04298b026F81069ff65b'
+
+
+def use_cache(monkeypatch, tmp_path, cache, sources):
+    monkeypatch.setattr(prices, 'PRICE_CACHE_PATH', str(tmp_path / 'prices.json'))
+    monkeypatch.setattr(prices, '_cache', cache)
+    monkeypatch.setattr(prices, 'SOURCES', sources)
+
+
+def test_fresh_fallback_price_waits_for_the_preferred_source(monkeypatch, tmp_path):
+    now = time.time()
+    asked = []
+
+    def preferred(tokens):
+        asked.append(tokens)
+        return {token: {'price': Decimal('1.01'), 'logo_url': 'logo'} for token in tokens}
+
+    def fallback(tokens):
+        raise AssertionError('the fallback source should not be asked')
+
+    cache = {
+        'preferred': {TOKEN.lower(): {'price': '0.9', 'logo_url': '', 'fetched_at': now - 2 * prices.PRICE_TTL}},
+        'fallback': {TOKEN.lower(): {'price': '0.5', 'logo_url': '', 'fetched_at': now}},
+    }
+    use_cache(monkeypatch, tmp_path, cache, {'preferred': preferred, 'fallback': fallback})
+
+    snapshot = prices.get_price_snapshots([TOKEN], sources=('preferred', 'fallback'))[TOKEN]
+    assert asked == [[TOKEN]]
+    assert snapshot['source'] == 'preferred'
+    assert snapshot['price'] == Decimal('1.01')
+    assert not snapshot['stale']
+
+    # Once the preferred source has missed, the fresh fallback entry is served
+    # without a request
+    monkeypatch.setattr(prices, 'SOURCES', {'preferred': lambda tokens: {}, 'fallback': fallback})
+    cache['preferred'] = {}
+    snapshot = prices.get_price_snapshots([TOKEN], sources=('preferred', 'fallback'))[TOKEN]
+    assert snapshot['source'] == 'fallback'
+    assert snapshot['price'] == Decimal('0.5')
+
+
+def test_cached_price_is_served_stale_if_every_source_fails(monkeypatch, tmp_path):
+    def failing(tokens):
+        raise ConnectionError('down')
+
+    cache = {
+        'preferred': {TOKEN.lower(): {'price': '0.9', 'logo_url': '', 'fetched_at': time.time() - 2 * prices.PRICE_TTL}},
+    }
+    use_cache(monkeypatch, tmp_path, cache, {'preferred': failing})
+
+    snapshot = prices.get_price_snapshots([TOKEN], sources=('preferred',))[TOKEN]
+    assert snapshot['stale']
+    assert snapshot['price'] == Decimal('0.9')
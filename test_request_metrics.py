@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test per-worker request metrics: snapshot files, retiring exited workers and
+the Flask and SQLAlchemy hooks behind /metrics
+"""
+
+import fcntl
+import json
+import os
+import subprocess
+import threading
+import time
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+import utils.request_metrics as request_metrics
+from utils.metrics import Metrics
+from utils.request_metrics import RETIRED_FILE, RequestMetrics
+
+
+def exited_pid():
+    process = subprocess.Popen(['true'])
+    process.wait()
+    return process.pid
+
+
+def write_snapshot(directory, name, requests):
+    worker = Metrics()
+    worker.inc('http_requests_total', requests, route='/info')
+    with open(os.path.join(directory, name), 'w') as file:
+        json.dump(worker.snapshot(), file)
+
+
+def total(snapshot, name):
+    return sum(value for counter, _, value in snapshot['counters'] if counter == name)
+
+
+def test_scrape_merges_every_worker_snapshot(tmp_path):
+    worker = RequestMetrics(directory=str(tmp_path), flush_seconds=3600)
+    worker.inc('http_requests_total', route='/info')
+    # Another live worker; the pid is alive, the start time tells them apart
+    write_snapshot(tmp_path, f'{os.getpid()}-1.json', 2)
+
+    assert os.path.basename(worker.snapshot_path()) == f'{worker.pid}-{worker.started_ns}.json'
+    assert total(worker.collect(), 'http_requests_total') == 3
+    assert sorted(os.listdir(tmp_path)) == sorted(['.lock', f'{os.getpid()}-1.json', os.path.basename(worker.snapshot_path())])
+
+
+def test_exited_workers_are_retired_once(tmp_path):
+    worker = RequestMetrics(directory=str(tmp_path), flush_seconds=3600)
+    worker.inc('http_requests_total', route='/info')
+    pid = exited_pid()
+    write_snapshot(tmp_path, f'{pid}-5.json', 2)
+    # Written before snapshot names carried a start time
+    write_snapshot(tmp_path, f'{pid}.json', 4)
+
+    assert total(worker.collect(), 'http_requests_total') == 7
+    assert total(worker.collect(), 'http_requests_total') == 7
+    assert sorted(os.listdir(tmp_path)) == sorted(['.lock', RETIRED_FILE, os.path.basename(worker.snapshot_path())])
+
+
+def test_retiring_waits_for_the_file_lock(tmp_path):
+    worker = RequestMetrics(directory=str(tmp_path), flush_seconds=3600)
+    exited = tmp_path / f'{exited_pid()}-5.json'
+    write_snapshot(tmp_path, exited.name, 2)
+
+    with open(tmp_path / '.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        retiring = threading.Thread(target=worker._retire_exited_workers)
+        retiring.start()
+        time.sleep(0.2)
+        assert exited.exists()
+        fcntl.flock(lock, fcntl.LOCK_UN)
+    retiring.join(timeout=5)
+
+    assert not exited.exists()
+    assert (tmp_path / RETIRED_FILE).exists()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(request_metrics, '_metrics', RequestMetrics(directory=str(tmp_path), flush_seconds=3600))
+    monkeypatch.setattr(request_metrics.atexit, 'register', lambda function: None)
+    engine = create_engine('sqlite://')
+    app = Flask(__name__)
+
+    @app.route('/info')
+    def info():
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            conn.execute(text('SELECT 2'))
+        return {'ok': True}
+
+    request_metrics.init_app(app)
+    return app.test_client()
+
+
+def test_metrics_endpoint_counts_requests_and_queries(client):
+    client.get('/info')
+    client.get('/info')
+    client.get('/missing')
+
+    lines = client.get('/metrics').get_data(as_text=True).splitlines()
+    assert 'http_requests_total{method="GET",route="/info",status="200"} 2' in lines
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"} 1' in lines
+    assert 'http_db_queries_total{route="/info"} 4' in lines
+    assert 'http_request_seconds_count{method="GET",route="/info"} 2' in lines
+    assert 'http_response_bytes_count{route="/info"} 2' in lines
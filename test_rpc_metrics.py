@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the per-run RPC metrics middleware and its summary and .prom output
+"""
+
+import importlib
+import json
+
+import pytest
+from eth_abi import encode
+from eth_utils import function_signature_to_4byte_selector
+
+from utils.multicall import AGGREGATE3_SELECTOR, MULTICALL3
+
+VAULT = '0x27B5739e22ad9033bcBf192059122d163b60349D'
+PPS = function_signature_to_4byte_selector('pricePerShare()')
+SUPPLY = function_signature_to_4byte_selector('totalSupply()')
+ABI = [
+    {'type': 'function', 'name': 'pricePerShare', 'inputs': [], 'outputs': [{'type': 'uint256'}]},
+    {'type': 'event', 'name': 'Transfer', 'inputs': []},
+]
+
+
+@pytest.fixture
+def rpc_metrics(node, monkeypatch):
+    # utils.rpc_metrics imports brownie through utils.call_cache
+    module = importlib.import_module('utils.rpc_metrics')
+    monkeypatch.setattr(module, 'installed_caches', lambda: [])
+    return module
+
+
+def upstream(method, params):
+    if method == 'eth_getLogs':
+        raise ValueError('query returned more than 10000 results')
+    if method == 'eth_getBalance':
+        return {'jsonrpc': '2.0', 'id': 0, 'error': {'code': -32000, 'message': 'missing trie node'}}
+    return {'jsonrpc': '2.0', 'id': 0, 'result': '0x' + '00' * 32}
+
+
+def test_middleware_counts_methods_errors_and_functions(rpc_metrics, tmp_path):
+    rpc_metrics.register_abi(ABI)
+    recorder = rpc_metrics.RpcMetrics()
+    request = rpc_metrics.rpc_metrics_middleware(recorder)(upstream, None)
+
+    request('eth_call', [{'to': VAULT, 'data': '0x' + PPS.hex()}, 'latest'])
+    aggregate = AGGREGATE3_SELECTOR + encode(
+        ['(address,bool,bytes)[]'], [[(VAULT, True, PPS), (VAULT, True, SUPPLY)]],
+    )
+    request('eth_call', [{'to': MULTICALL3, 'data': '0x' + aggregate.hex()}, '0x10'])
+    request('eth_getBalance', [VAULT, 'latest'])
+    with pytest.raises(ValueError):
+        request('eth_getLogs', [{'fromBlock': '0x0', 'toBlock': '0x10'}])
+
+    summary = recorder.summary()
+    assert summary['requests'] == 4
+    assert summary['methods']['eth_call']['requests'] == 2
+    assert summary['methods']['eth_getBalance']['errors'] == 1
+    assert summary['methods']['eth_getLogs']['errors'] == 1
+    # Unregistered selectors are counted by selector
+    assert summary['functions'] == {
+        'pricePerShare': {'eth_call': 1, 'multicall': 1},
+        '0x' + SUPPLY.hex(): {'eth_call': 0, 'multicall': 1},
+    }
+
+    summary_path = recorder.write('test', directory=str(tmp_path))
+    with open(summary_path) as file:
+        assert json.load(file)['requests'] == 4
+    lines = (tmp_path / 'rpc_test.prom').read_text().splitlines()
+    assert '# TYPE rpc_requests_total counter' in lines
+    assert 'rpc_requests_total{method="eth_call"} 2' in lines
+    assert 'rpc_errors_total{method="eth_getLogs"} 1' in lines
+    assert 'rpc_contract_calls_total{function="pricePerShare",via="multicall"} 1' in lines
+    assert 'rpc_request_seconds_count{method="eth_call"} 2' in lines
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Test that concurrent store writers keep every manifest entry
+"""
+
+import threading
+
+import utils.store as store
+
+
+def test_concurrent_writers_keep_every_manifest_entry(tmp_path):
+    store_dir = str(tmp_path)
+    rounds = 20
+
+    def write(section, key):
+        for i in range(rounds):
+            store.write_section(section, {key: i}, store_dir)
+
+    writers = [
+        threading.Thread(target=write, args=('chart_data', 'chart_data')),
+        threading.Thread(target=write, args=('treasury', 'treasury_balance_sheet')),
+        threading.Thread(target=lambda: [store.write_payload(f'p{i}', b'{}', store_dir) for i in range(rounds)]),
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+
+    manifest = store.read_manifest(store_dir)
+    assert manifest['version'] == 3 * rounds
+    assert manifest['sections']['chart_data']['version'] == rounds
+    assert manifest['sections']['treasury']['version'] == rounds
+    assert sorted(manifest['payloads']) == sorted(f'p{i}' for i in range(rounds))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test that the incremental weekly APR refresh matches a full recompute, on the
+fake chain the refresh benchmarks use
+"""
+
+import math
+from datetime import datetime
+
+import benchmarks.fake_chain as fake_chain
+import utils.store as store
+
+WEEK = 7 * 24 * 60 * 60
+BLOCK_TIME = 12
+
+
+def save_weekly_history(apr_charts, rows):
+    """Store rows the way save_chart_data_to_cache does, stamped with the chain time"""
+    rows = [{key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()} for row in rows]
+    store.write_section('chart_data', {
+        'chart_data': {'weekly_aprs': rows, 'last_updated': apr_charts.chain.time()},
+    })
+
+
+def rewind(monkeypatch, blocks):
+    """Move the head back, leaving every block's timestamp where it was"""
+    monkeypatch.setattr(fake_chain, 'HEAD', fake_chain.HEAD - blocks)
+    monkeypatch.setattr(fake_chain, 'HEAD_TS', fake_chain.HEAD_TS - blocks * BLOCK_TIME)
+
+
+def test_incremental_weekly_aprs_match_a_full_recompute(pipeline, monkeypatch):
+    apr_charts = pipeline.apr_charts
+    symbols = [data['symbol'] for data in apr_charts.CURVE_LIQUID_LOCKER_COMPOUNDERS.values()]
+
+    pipeline.fresh_state()
+    full = apr_charts.weekly_apr(history={})
+    full_reads = pipeline.node.counts['eth_call']
+
+    # An earlier run, two weeks and two minutes after a week closed: its most
+    # recent week was sampled near the head and has to be recomputed
+    later_now = apr_charts.chain.time()
+    earlier_now = (later_now // WEEK - 2) * WEEK + 120
+    with monkeypatch.context() as rewound:
+        rewind(rewound, math.ceil((later_now - earlier_now) / BLOCK_TIME))
+        pipeline.fresh_state()
+        earlier = apr_charts.weekly_apr(history={})
+        unsettled = earlier[0]['ts']
+        assert apr_charts.chain.time() - unsettled < apr_charts.WEEK_SETTLE_SECONDS
+        # Stand-in for a sample whose end block later reorged
+        earlier[0] = dict(earlier[0], **{symbol: 99.0 for symbol in symbols})
+        save_weekly_history(apr_charts, earlier)
+
+    pipeline.node.reset()
+    incremental = apr_charts.weekly_apr()
+
+    assert incremental == full
+    # The oldest weeks of the earlier run fell out of the window
+    assert earlier[-1]['ts'] < incremental[-1]['ts']
+    assert unsettled in {row['ts'] for row in incremental}
+    # Only the two new weeks, the unsettled one and their boundaries were read
+    assert pipeline.node.counts['eth_call'] < full_reads / 2
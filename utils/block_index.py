@@ -0,0 +1,144 @@
+import bisect
+import os
+import threading
+from functools import lru_cache
+
+from brownie import chain
+
+# Blocks this close to the head may still reorg, so their timestamps are not persisted
+FINALITY_DEPTH = 64
+# Below this bracket width, bisect instead of interpolating
+LINEAR_SEARCH_WIDTH = 4
+
+
+class BlockIndex:
+    """
+    Sorted (block, timestamp) samples, persisted as an append-only CSV.
+
+    Lookups bracket the target timestamp between the nearest known samples and
+    interpolate inside that bracket. Block times are close to uniform, so a
+    lookup usually settles in two or three RPCs, and every block fetched on the
+    way becomes an anchor for the next lookup.
+    """
+
+    def __init__(self, path, get_timestamp, get_height):
+        self.path = path
+        self.get_timestamp = get_timestamp
+        self.get_height = get_height
+        self.blocks = []
+        self.timestamps = []
+        self.lock = threading.RLock()
+        self.rpc_count = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        samples = {}
+        with open(self.path, 'r') as file:
+            for line in file:
+                try:
+                    block, timestamp = line.split(',')
+                    samples[int(block)] = int(timestamp)
+                except ValueError:
+                    # A torn last line from an interrupted run
+                    continue
+        for block in sorted(samples):
+            self.blocks.append(block)
+            self.timestamps.append(samples[block])
+
+    def _append(self, block, timestamp):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.path, 'a') as file:
+            file.write(f'{block},{timestamp}\n')
+
+    def timestamp(self, block, height=None):
+        with self.lock:
+            i = bisect.bisect_left(self.blocks, block)
+            if i < len(self.blocks) and self.blocks[i] == block:
+                return self.timestamps[i]
+
+        timestamp = self.get_timestamp(block)
+        height = self.get_height() if height is None else height
+        with self.lock:
+            self.rpc_count += 1
+            i = bisect.bisect_left(self.blocks, block)
+            if i == len(self.blocks) or self.blocks[i] != block:
+                self.blocks.insert(i, block)
+                self.timestamps.insert(i, timestamp)
+                if block <= height - FINALITY_DEPTH:
+                    self._append(block, timestamp)
+        return timestamp
+
+    def block_after(self, timestamp, height=None):
+        """
+        First block with a timestamp strictly greater than timestamp.
+        Returns the head itself if it carries exactly that timestamp.
+        """
+        height = self.get_height() if height is None else height
+        head_ts = self.timestamp(height, height)
+        if head_ts < timestamp:
+            raise IndexError('timestamp is in the future')
+        if head_ts == timestamp:
+            return height
+
+        # Invariant: ts(lo) <= timestamp < ts(hi)
+        with self.lock:
+            i = bisect.bisect_right(self.timestamps, timestamp)
+            lo = self.blocks[i - 1] if i > 0 else 0
+            hi = self.blocks[i] if i < len(self.blocks) and self.blocks[i] <= height else height
+        lo_ts = self.timestamp(lo, height)
+        if lo_ts > timestamp:
+            return lo
+        hi_ts = self.timestamp(hi, height)
+
+        while hi - lo > 1:
+            if hi - lo <= LINEAR_SEARCH_WIDTH or hi_ts == lo_ts:
+                mid = lo + (hi - lo) // 2
+            else:
+                mid = lo + (timestamp - lo_ts) * (hi - lo) // (hi_ts - lo_ts)
+                mid = min(max(mid, lo + 1), hi - 1)
+            mid_ts = self.timestamp(mid, height)
+            if mid_ts > timestamp:
+                hi, hi_ts = mid, mid_ts
+            else:
+                lo, lo_ts = mid, mid_ts
+        return hi
+
+    def blocks_after(self, timestamps):
+        """
+        block_after for a batch of timestamps, resolved in ascending order so
+        each lookup starts from the anchors the previous one added.
+        """
+        height = self.get_height()
+        return {ts: self.block_after(ts, height) for ts in sorted(set(timestamps))}
+
+
+@lru_cache(maxsize=None)
+def get_block_index():
+    return BlockIndex(
+        f'cache/{chain.id}/block_index.csv',
+        lambda block: chain[block].timestamp,
+        lambda: chain.height,
+    )
+
+
+def get_block_timestamp(block):
+    return get_block_index().timestamp(block)
+
+
+def closest_block_after_timestamp(timestamp):
+    return get_block_index().block_after(timestamp)
+
+
+def closest_block_before_timestamp(timestamp):
+    """
+    Last block with a timestamp at or before timestamp
+    """
+    return closest_block_after_timestamp(timestamp) - 1
+
+
+def blocks_after_timestamps(timestamps):
+    return get_block_index().blocks_after(timestamps)
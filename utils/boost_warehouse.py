@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import requests
+
+BOOST_DATA_URL = 'https://raw.githubusercontent.com/wavey0x/open-data/master/raw_boost_data.json'
+WAREHOUSE_PATH = 'data/boost_data.duckdb'
+REQUEST_TIMEOUT = 60
+INDEXED_COLUMNS = ('account', 'receiver', 'boost_delegate')
+
+META_SCHEMA = 'CREATE TABLE IF NOT EXISTS boost_meta (key VARCHAR PRIMARY KEY, value VARCHAR)'
+
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def connect(path=WAREHOUSE_PATH):
+    import duckdb
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    con = duckdb.connect(path)
+    con.execute(META_SCHEMA)
+    return con
+
+
+def get_connection():
+    """
+    A cursor on the warehouse, which stays open for the life of the process
+    """
+    global _connection
+    with _connection_lock:
+        if _connection is None:
+            _connection = connect()
+        return _connection.cursor()
+
+
+def _meta(con):
+    return dict(con.execute('SELECT key, value FROM boost_meta').fetchall())
+
+
+def _set_meta(con, values):
+    con.executemany('INSERT OR REPLACE INTO boost_meta VALUES (?, ?)', [(k, str(v)) for k, v in values.items() if v is not None])
+
+
+def _record_hash(record):
+    return hashlib.sha256(json.dumps(record, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _table_exists(con):
+    return con.execute(
+        "SELECT count(*) FROM information_schema.tables WHERE table_name = 'boost_data'"
+    ).fetchone()[0] > 0
+
+
+def _load_records(con, records, create):
+    """
+    Insert records through a newline-delimited JSON file so DuckDB types the
+    columns itself. New rows are read with the table's existing column types.
+    """
+    fd, path = tempfile.mkstemp(suffix='.ndjson')
+    try:
+        with os.fdopen(fd, 'w') as file:
+            for record in records:
+                file.write(json.dumps(record) + '\n')
+        if create:
+            con.execute(f"CREATE OR REPLACE TABLE boost_data AS SELECT * FROM read_json_auto('{path}', format='newline_delimited')")
+            for column in INDEXED_COLUMNS:
+                con.execute(f'CREATE INDEX IF NOT EXISTS boost_data_{column} ON boost_data ({column})')
+        else:
+            columns = {name: dtype for name, dtype, *_ in con.execute('DESCRIBE boost_data').fetchall()}
+            con.execute(
+                f"INSERT INTO boost_data BY NAME SELECT * FROM read_json('{path}', format='newline_delimited', columns={columns!r})"
+            )
+    finally:
+        os.remove(path)
+
+
+def refresh(con=None):
+    """
+    Bring the warehouse up to date with the published boost data.
+
+    The download is a conditional GET, so an unchanged file costs a 304. The
+    published file only ever grows, so when it changes only the records past
+    the stored count are inserted. If the last stored record no longer matches
+    (the file was rewritten), the table is rebuilt. Returns the rows added.
+    """
+    con = con or get_connection()
+    meta = _meta(con)
+    exists = _table_exists(con)
+    headers = {}
+    if exists and meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if exists and meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    response = requests.get(BOOST_DATA_URL, headers=headers, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304:
+        return 0
+    response.raise_for_status()
+    records = response.json()['data']
+
+    count = int(meta.get('record_count', 0)) if exists else 0
+    append = (
+        exists
+        and 0 < count <= len(records)
+        and _record_hash(records[count - 1]) == meta.get('last_record_hash')
+    )
+    new_records = records[count:] if append else records
+
+    con.execute('BEGIN TRANSACTION')
+    try:
+        if new_records:
+            _load_records(con, new_records, create=not append)
+        _set_meta(con, {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'record_count': len(records),
+            'last_record_hash': _record_hash(records[-1]) if records else '',
+        })
+    except BaseException:
+        con.execute('ROLLBACK')
+        raise
+    con.execute('COMMIT')
+    print(f"✅ Boost warehouse: {len(new_records)} {'new' if append else 'loaded'} records")
+    return len(new_records)
+
+
+def query(sql):
+    """
+    Run sql against the local boost_data table, as a DataFrame. Only
+    downloads when the warehouse has never been filled.
+    """
+    con = get_connection()
+    if not _table_exists(con):
+        refresh(con)
+    return con.execute(sql).fetchdf()
+
+
+def addresses():
+    """
+    Every distinct account, receiver and boost delegate in the boost data
+    """
+    rows = query(
+        'SELECT account AS address FROM boost_data '
+        'UNION SELECT receiver FROM boost_data '
+        'UNION SELECT boost_delegate FROM boost_data'
+    )
+    return [address for address in rows['address'] if address]
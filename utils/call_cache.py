@@ -0,0 +1,195 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from utils.block_index import FINALITY_DEPTH
+
+CACHE_PATH = 'cache/eth_call.sqlite'
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+# Evict down to this fraction of the cap so eviction does not run on every write
+EVICT_TO_FRACTION = 0.9
+HEAD_REFRESH_SECONDS = 12
+# Last-used times of cache hits are written in batches of this many, and
+# before every write, rather than once per hit
+TOUCH_BATCH_SIZE = 256
+
+
+def _block_number(block_identifier):
+    if isinstance(block_identifier, int):
+        return block_identifier
+    if isinstance(block_identifier, str) and block_identifier.startswith('0x'):
+        return int(block_identifier, 16)
+    # 'latest', 'pending', block hashes as dicts etc. are never cached
+    return None
+
+
+class CallCache:
+    """
+    On-disk cache of eth_call results at finalized blocks.
+
+    State at a block more than finality_depth below the head can no longer
+    change, so the result is addressed purely by (chain id, target, calldata,
+    block). Entries carry a last-used time and the least recently used ones are
+    evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_CACHE_BYTES, finality_depth=FINALITY_DEPTH):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.max_bytes = max_bytes
+        self.finality_depth = finality_depth
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            '''CREATE TABLE IF NOT EXISTS eth_calls (
+                key TEXT PRIMARY KEY,
+                chain_id INTEGER,
+                address TEXT,
+                block INTEGER,
+                result TEXT,
+                size INTEGER,
+                last_used REAL
+            )'''
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS eth_calls_last_used ON eth_calls (last_used)')
+        self.conn.commit()
+        self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM eth_calls').fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._head = (0, 0.0)
+        # key -> last used time, not yet written
+        self._touched = {}
+
+    @staticmethod
+    def key(chain_id, address, calldata, block):
+        raw = f'{chain_id}:{address.lower()}:{calldata.lower()}:{block}'
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def head(self, w3):
+        height, checked_at = self._head
+        if time.time() - checked_at > HEAD_REFRESH_SECONDS:
+            height = w3.eth.block_number
+            self._head = (height, time.time())
+        return height
+
+    def is_final(self, block, w3):
+        return block <= self.head(w3) - self.finality_depth
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute('SELECT result FROM eth_calls WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH_SIZE:
+                self._flush_touches()
+                self.conn.commit()
+            return row[0]
+
+    def _flush_touches(self):
+        self.conn.executemany(
+            'UPDATE eth_calls SET last_used = ? WHERE key = ?',
+            [(last_used, key) for key, last_used in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def put(self, key, chain_id, address, block, result):
+        size = len(key) + len(result)
+        with self.lock:
+            # Eviction orders by last_used, so it has to see every hit
+            self._flush_touches()
+            previous = self.conn.execute('SELECT size FROM eth_calls WHERE key = ?', (key,)).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO eth_calls VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, chain_id, address.lower(), block, result, size, time.time()),
+            )
+            self.total_bytes += size - (previous[0] if previous else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        target = self.max_bytes * EVICT_TO_FRACTION
+        rows = self.conn.execute('SELECT key, size FROM eth_calls ORDER BY last_used ASC')
+        evicted = []
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            evicted.append((key,))
+            self.total_bytes -= size
+        self.conn.executemany('DELETE FROM eth_calls WHERE key = ?', evicted)
+        self.evictions += len(evicted)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'size_bytes': self.total_bytes,
+        }
+
+
+def call_cache_middleware(cache):
+    """
+    web3 middleware answering eth_call at finalized blocks from cache
+    """
+    def middleware(make_request, w3):
+        chain_id = []
+
+        def inner(method, params):
+            if method != 'eth_call' or len(params) != 2:
+                return make_request(method, params)
+            block = _block_number(params[1])
+            if block is None or not cache.is_final(block, w3):
+                return make_request(method, params)
+
+            if not chain_id:
+                chain_id.append(w3.eth.chain_id)
+            tx = params[0]
+            address = tx.get('to') or ''
+            calldata = tx.get('data') or tx.get('input') or '0x'
+            if isinstance(calldata, bytes):
+                calldata = '0x' + calldata.hex()
+            key = cache.key(chain_id[0], address, calldata, block)
+
+            result = cache.get(key)
+            if result is not None:
+                return {'jsonrpc': '2.0', 'id': 0, 'result': result}
+
+            response = make_request(method, params)
+            if 'error' not in response and isinstance(response.get('result'), str):
+                cache.put(key, chain_id[0], address, block, response['result'])
+            return response
+
+        return inner
+
+    return middleware
+
+
+_installed = {}
+
+
+def install(w3=None, path=CACHE_PATH):
+    """
+    Put the call cache under every Contract call made through w3. Idempotent.
+    """
+    if w3 is None:
+        from brownie import web3 as w3
+    if id(w3) not in _installed:
+        cache = CallCache(path)
+        w3.middleware_onion.add(call_cache_middleware(cache), name='call_cache')
+        _installed[id(w3)] = cache
+    return _installed[id(w3)]
+
+
+def installed_caches():
+    return list(_installed.values())
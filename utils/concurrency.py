@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TokenBucket:
+    """
+    Allow rate calls per second on average, with bursts of up to burst calls.
+    acquire() blocks until a token is available. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket_for(endpoint, rate, burst=None):
+    """
+    One shared TokenBucket per endpoint, so every caller of an RPC node or
+    HTTP API draws from the same budget.
+    """
+    with _buckets_lock:
+        if endpoint not in _buckets:
+            _buckets[endpoint] = TokenBucket(rate, burst)
+        return _buckets[endpoint]
+
+
+def rate_limit_middleware(bucket):
+    def middleware(make_request, w3):
+        def inner(method, params):
+            bucket.acquire()
+            return make_request(method, params)
+        return inner
+    return middleware
+
+
+def install_rate_limit(w3, rate, burst=None):
+    """
+    Rate limit every JSON-RPC request w3 sends to its endpoint. The middleware
+    sits innermost, so requests answered by a cache do not spend tokens.
+    """
+    if not rate or 'rate_limit' in w3.middleware_onion:
+        return
+    endpoint = getattr(w3.provider, 'endpoint_uri', None) or repr(w3.provider)
+    w3.middleware_onion.inject(rate_limit_middleware(bucket_for(endpoint, rate, burst)), name='rate_limit', layer=0)
+
+
+def bounded_map(fn, items, max_workers):
+    """
+    fn over items with at most max_workers calls in flight.
+    Results come back in input order, exactly as a sequential map would.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(fn, items))
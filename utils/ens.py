@@ -0,0 +1,136 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+from utils.concurrency import bounded_map
+
+ENS_DB_PATH = 'cache/ens.sqlite'
+LEGACY_ENS_CACHE = 'ens_cache.json'
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+# Addresses without a reverse record are checked again after this long
+NEGATIVE_TTL = 7 * 24 * 60 * 60
+# Primary names can change, so found names are refreshed too, just less often
+POSITIVE_TTL = 30 * 24 * 60 * 60
+ENS_CONCURRENCY = int(os.getenv('ENS_CONCURRENCY', 8))
+# Results are committed every this many lookups, so an interrupted run resumes
+CHECKPOINT_EVERY = 100
+
+
+class EnsStore:
+    """
+    Reverse ENS names keyed by lowercased address, in SQLite. Every row is also
+    held in memory, so lookups are dict reads against a store opened once.
+    An empty name records that the address had no reverse record.
+    """
+
+    def __init__(self, path=ENS_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            '''CREATE TABLE IF NOT EXISTS ens_names (
+                address TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                resolved_at REAL NOT NULL
+            )'''
+        )
+        self.conn.commit()
+        self.entries = {
+            address: (name, resolved_at)
+            for address, name, resolved_at in self.conn.execute('SELECT address, name, resolved_at FROM ens_names')
+        }
+
+    def lookup(self, address):
+        entry = self.entries.get(address.lower())
+        return entry[0] if entry else ''
+
+    def names(self):
+        """
+        {address: name} for every address with a reverse record
+        """
+        return {address: name for address, (name, _) in self.entries.items() if name}
+
+    def is_fresh(self, address, now=None):
+        entry = self.entries.get(address.lower())
+        if entry is None:
+            return False
+        name, resolved_at = entry
+        ttl = POSITIVE_TTL if name else NEGATIVE_TTL
+        return (now or time.time()) - resolved_at < ttl
+
+    def put_many(self, rows, resolved_at=None):
+        """
+        rows: (address, name) pairs, committed together
+        """
+        resolved_at = resolved_at or time.time()
+        rows = [(address.lower(), name or '', resolved_at) for address, name in rows]
+        with self.lock:
+            self.conn.executemany('INSERT OR REPLACE INTO ens_names VALUES (?, ?, ?)', rows)
+            self.conn.commit()
+            for address, name, at in rows:
+                self.entries[address] = (name, at)
+
+    def migrate_legacy(self, path=LEGACY_ENS_CACHE):
+        """
+        Import ens_cache.json once, dated by the file's mtime
+        """
+        if self.entries or not os.path.exists(path):
+            return
+        with open(path, 'r') as file:
+            legacy = json.load(file)
+        self.put_many(legacy.items(), resolved_at=os.path.getmtime(path))
+        print(f'✅ Migrated {len(legacy)} ENS names from {path}')
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    store = EnsStore()
+    store.migrate_legacy()
+    return store
+
+
+def lookup(address):
+    return get_store().lookup(address)
+
+
+def reverse_lookup(address):
+    from brownie import web3
+
+    name = web3.ens.name(address)
+    return '' if name is None or name == 'null' else name
+
+
+def resolve(addresses, resolve_name=reverse_lookup, store=None, max_workers=ENS_CONCURRENCY):
+    """
+    Reverse-resolve every address that has no fresh entry, max_workers at a time,
+    committing every CHECKPOINT_EVERY results. Addresses whose lookup raised are
+    not stored and will be retried next run. Returns the number resolved.
+    """
+    store = store or get_store()
+    now = time.time()
+    pending = [
+        address for address in dict.fromkeys(addresses)
+        if address and address != ZERO_ADDRESS and not store.is_fresh(address, now)
+    ]
+
+    def resolve_one(address):
+        try:
+            return address, resolve_name(address)
+        except Exception as e:
+            print(f'❌ ENS lookup failed for {address}: {e}')
+            return address, None
+
+    resolved = 0
+    for i in range(0, len(pending), CHECKPOINT_EVERY):
+        results = bounded_map(resolve_one, pending[i:i + CHECKPOINT_EVERY], max_workers)
+        rows = [(address, name) for address, name in results if name is not None]
+        store.put_many(rows)
+        resolved += len(rows)
+        print(f'ENS: {i + len(results)}/{len(pending)} addresses checked')
+    return resolved
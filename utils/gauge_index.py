@@ -0,0 +1,203 @@
+import heapq
+import re
+from collections import defaultdict
+
+# Imported by app.py, so this module must not import brownie.
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+MIN_TRIGRAM_SIMILARITY = 0.3
+
+# Score per kind of match; the best one a gauge gets decides its rank
+EXACT_SCORE = 100
+PREFIX_SCORE = 80
+WORD_PREFIX_SCORE = 60
+TRIGRAM_SCORE = 40
+
+
+def normalize(text):
+    return ' '.join(WORD_RE.findall(str(text).lower()))
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _boost_range(apys):
+    # Curve's API gives [apy at 1x boost, apy at 2.5x boost]
+    if isinstance(apys, (list, tuple)) and len(apys) == 2:
+        return {'min_boost': apys[0], 'max_boost': apys[1]}
+    return None
+
+
+class PrefixTrie:
+    """
+    Character trie where every node holds the ids of all entries below it,
+    so a prefix lookup is one walk down the trie.
+    """
+
+    def __init__(self):
+        self.root = {'ids': set(), 'children': {}}
+
+    def insert(self, key, doc_id):
+        node = self.root
+        for char in key:
+            node = node['children'].setdefault(char, {'ids': set(), 'children': {}})
+            node['ids'].add(doc_id)
+
+    def prefixed(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node['children'].get(char)
+            if node is None:
+                return set()
+        return node['ids']
+
+
+class GaugeSearchIndex:
+    """
+    In-memory search over the curve_gauges cache section: gauge names, pool
+    names, token symbols and gauge/pool/LP token addresses. Ranks exact matches,
+    then whole-name prefixes, then per-word prefixes, then trigram similarity
+    so typos and infix matches still find something.
+    """
+
+    def __init__(self, curve_gauge_data, curve_gauges_by_name=None):
+        self.docs = []
+        self.by_address = {}
+        self.names = []
+        self.word_trie = PrefixTrie()
+        self.name_trie = PrefixTrie()
+        self.trigram_ids = defaultdict(set)
+
+        for gauge_address, info in (curve_gauge_data or {}).items():
+            self._add(self._document(gauge_address, info))
+
+        # Gauges only known by name, e.g. from an older cache layout
+        for name, entry in (curve_gauges_by_name or {}).items():
+            address = entry.get('gauge_address') or ''
+            if address and address.lower() not in self.by_address:
+                self._add({
+                    'result': {'name': name, 'gauge_address': address},
+                    'details': {'gauge_address': address, 'curve_key': name},
+                    'addresses': [address.lower()],
+                    'search_text': [name],
+                    'weight': 0,
+                })
+
+        # Tie-break order among equal scores: heaviest gauge first, then by name
+        order = sorted(range(len(self.docs)), key=lambda i: (-self.docs[i]['weight'], self.docs[i]['result']['name']))
+        self.rank = [0] * len(self.docs)
+        for position, doc_id in enumerate(order):
+            self.rank[doc_id] = position
+
+    def _add(self, doc):
+        doc_id = len(self.docs)
+        self.docs.append(doc)
+        self.by_address[doc['result']['gauge_address'].lower()] = doc_id
+
+        names = {normalize(text) for text in doc['search_text'] if text}
+        names.discard('')
+        self.names.append(names)
+        for name in names:
+            self.name_trie.insert(name, doc_id)
+            for word in name.split(' '):
+                self.word_trie.insert(word, doc_id)
+            for trigram in trigrams(name):
+                self.trigram_ids[trigram].add(doc_id)
+        for address in doc['addresses']:
+            self.name_trie.insert(address, doc_id)
+
+    @staticmethod
+    def _document(gauge_address, info):
+        name = info.get('curve_key') or info.get('name') or gauge_address
+        symbols = [
+            coin.get('symbol') for coin in (info.get('coins') or [])
+            if isinstance(coin, dict) and coin.get('symbol')
+        ]
+        addresses = [
+            address.lower() for address in (gauge_address, info.get('swap'), info.get('swap_token'), info.get('lpToken'))
+            if isinstance(address, str) and address.startswith('0x')
+        ]
+        try:
+            weight = int((info.get('gauge_controller') or {}).get('gauge_relative_weight', 0))
+        except (TypeError, ValueError):
+            weight = 0
+
+        details = dict(info)
+        details.update({
+            'gauge_address': gauge_address,
+            'curve_key': name,
+            'pool_address': info.get('swap'),
+            'pool_name': info.get('shortName') or info.get('name'),
+            'pool_urls': info.get('poolUrls'),
+            'blockchain': info.get('blockchainId'),
+            'lendingVaultAddress': info.get('lendingVaultAddress'),
+            'apy_data': {
+                'gauge_crv_apy': _boost_range(info.get('gaugeCrvApy')),
+                'gauge_future_crv_apy': _boost_range(info.get('gaugeFutureCrvApy')),
+            },
+        })
+        return {
+            'result': {
+                'name': name,
+                'gauge_address': gauge_address,
+                'pool_address': info.get('swap'),
+                'pool_name': info.get('shortName') or info.get('name'),
+                'blockchain': info.get('blockchainId'),
+                'is_killed': info.get('is_killed', False),
+            },
+            'details': details,
+            'addresses': addresses,
+            'search_text': [name, info.get('name'), info.get('shortName')] + symbols,
+            'weight': weight,
+        }
+
+    def get(self, gauge_address):
+        doc_id = self.by_address.get((gauge_address or '').lower())
+        return None if doc_id is None else self.docs[doc_id]['details']
+
+    def search(self, query, limit=10):
+        scores = {}
+
+        def score(doc_ids, value):
+            for doc_id in doc_ids:
+                if scores.get(doc_id, 0) < value:
+                    scores[doc_id] = value
+
+        raw = query.strip().lower()
+        if raw.startswith('0x'):
+            score(self.name_trie.prefixed(raw), PREFIX_SCORE)
+        else:
+            normalized = normalize(raw)
+            if not normalized:
+                return []
+
+            # Every query word must prefix some word of the gauge
+            words = normalized.split(' ')
+            matched = set(self.word_trie.prefixed(words[0]))
+            for word in words[1:]:
+                matched &= self.word_trie.prefixed(word)
+            score(matched, WORD_PREFIX_SCORE)
+
+            prefixed = self.name_trie.prefixed(normalized)
+            score(prefixed, PREFIX_SCORE)
+            score([doc_id for doc_id in prefixed if normalized in self.names[doc_id]], EXACT_SCORE)
+
+            # Fuzzy matches only rank below the others, so skip them when those fill the page
+            if len(scores) < limit:
+                query_trigrams = trigrams(normalized)
+                counts = defaultdict(int)
+                for trigram in query_trigrams:
+                    for doc_id in self.trigram_ids.get(trigram, ()):
+                        counts[doc_id] += 1
+                for doc_id, count in counts.items():
+                    similarity = count / len(query_trigrams)
+                    if similarity >= MIN_TRIGRAM_SIMILARITY:
+                        score([doc_id], TRIGRAM_SCORE * similarity)
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], self.rank[item[0]]))
+        return [
+            dict(self.docs[doc_id]['result'], score=round(value, 2))
+            for doc_id, value in ranked[:limit]
+        ]
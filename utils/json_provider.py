@@ -0,0 +1,71 @@
+import dataclasses
+import datetime
+import decimal
+import json
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def default(value):
+    """
+    Types neither encoder handles on its own. Decimals become plain-notation
+    strings so Numeric(30, 18) columns keep every digit.
+    """
+    if isinstance(value, decimal.Decimal):
+        return format(value, 'f')
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    # numpy scalars, when orjson is not there to take them natively
+    if hasattr(value, 'item') and callable(value.item):
+        return value.item()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _stdlib_dumps_bytes(obj):
+    return json.dumps(obj, default=default, separators=(',', ':')).encode('utf-8')
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj):
+        try:
+            return orjson.dumps(obj, default=default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # orjson rejects ints wider than 64 bits (e.g. raw token amounts)
+            # without calling default; the stdlib encoder takes them
+            return _stdlib_dumps_bytes(obj)
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    dumps_bytes = _stdlib_dumps_bytes
+
+    def loads(data):
+        return json.loads(data)
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson, with the stdlib json module as a
+    fallback when orjson is not installed. Output is compact and keeps key order.
+    """
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.store import atomic_write_bytes
+
+DEFAULT_CHUNK_SIZE = 100_000
+MAX_CHUNK_SIZE = 2_000_000
+# Ranges returning fewer logs than this double the chunk size for the next ones
+GROW_BELOW_LOGS = 1_000
+LOG_CONCURRENCY = int(os.getenv('LOG_CONCURRENCY', 4))
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 2
+
+# Substrings providers use when a getLogs range is too big to answer
+RANGE_TOO_LARGE_ERRORS = (
+    '-32005',
+    'query returned more than',
+    'block range',
+    'response size',
+)
+# Substrings of rate limit errors; these are retried at the same range size
+RATE_LIMITED_ERRORS = (
+    '429',
+    'too many requests',
+    'rate limit',
+)
+
+
+def is_rate_limited(error):
+    message = str(error).lower()
+    return any(text in message for text in RATE_LIMITED_ERRORS)
+
+
+def is_range_too_large(error):
+    message = str(error).lower()
+    return not is_rate_limited(error) and any(text in message for text in RANGE_TOO_LARGE_ERRORS)
+
+
+class ChunkSizer:
+    """
+    Block span for the next getLogs range: halved whenever the provider rejects
+    a range as too large, doubled while ranges come back sparse.
+    """
+
+    def __init__(self, size=DEFAULT_CHUNK_SIZE, max_size=MAX_CHUNK_SIZE):
+        self.size = size
+        self.max_size = max_size
+        self.lock = threading.Lock()
+
+    def shrink(self, span):
+        with self.lock:
+            self.size = max(1, min(self.size, span) // 2)
+
+    def observe(self, span, log_count):
+        with self.lock:
+            if log_count < GROW_BELOW_LOGS and span >= self.size:
+                self.size = min(self.max_size, self.size * 2)
+
+
+def read_checkpoint(path, start_block):
+    """
+    Last block a scan from start_block fully consumed, or None if the
+    checkpoint is missing or was written by a scan from another block
+    """
+    try:
+        with open(path, 'r') as file:
+            checkpoint = json.load(file)
+        if checkpoint['start_block'] != start_block:
+            return None
+        return checkpoint['block']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_checkpoint(path, start_block, block):
+    body = {'start_block': start_block, 'block': block, 'updated': int(time.time())}
+    atomic_write_bytes(path, json.dumps(body).encode('utf-8'))
+
+
+def iter_logs(fetch, start_block, end_block, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=LOG_CONCURRENCY, checkpoint_path=None):
+    """
+    Yield the logs fetch(from_block, to_block) returns for [start_block, end_block],
+    in block order.
+
+    Up to max_workers ranges are fetched at once. A range the provider rejects
+    as too large is split in two and the chunk size shrinks; sparse ranges grow
+    it. Rate limited ranges and other errors are retried at the same size,
+    MAX_RETRIES times with backoff.
+
+    With checkpoint_path, a scan from the same start_block resumes after the
+    last block recorded there, and a block is recorded once every log up to it
+    has been consumed, so stopping early never skips logs on the next run.
+    """
+    next_block = start_block
+    if checkpoint_path:
+        done = read_checkpoint(checkpoint_path, start_block)
+        if done is not None:
+            next_block = max(start_block, done + 1)
+    if next_block > end_block:
+        return
+
+    sizer = ChunkSizer(chunk_size)
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    # Ranges in block order: [from_block, to_block, future, attempts]
+    pending = deque()
+
+    def submit(lo, hi, attempts=0):
+        return [lo, hi, pool.submit(fetch, lo, hi), attempts]
+
+    try:
+        while True:
+            while len(pending) < max_workers and next_block <= end_block:
+                hi = min(end_block, next_block + sizer.size - 1)
+                pending.append(submit(next_block, hi))
+                next_block = hi + 1
+            if not pending:
+                break
+
+            lo, hi, future, attempts = pending.popleft()
+            try:
+                logs = future.result()
+            except Exception as e:
+                if hi > lo and is_range_too_large(e):
+                    sizer.shrink(hi - lo + 1)
+                    mid = lo + (hi - lo) // 2
+                    pending.appendleft(submit(mid + 1, hi))
+                    pending.appendleft(submit(lo, mid))
+                    continue
+                if attempts >= MAX_RETRIES:
+                    raise
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempts)
+                pending.appendleft(submit(lo, hi, attempts + 1))
+                continue
+
+            sizer.observe(hi - lo + 1, len(logs))
+            yield from logs
+            if checkpoint_path:
+                write_checkpoint(checkpoint_path, start_block, hi)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,140 @@
+# Counters and histograms shared by the RPC instrumentation in the scripts and
+# the request metrics in app.py, with Prometheus text exposition.
+# Imported by app.py, so this module must not import brownie.
+import bisect
+import threading
+
+# Upper bounds in seconds, Prometheus' default buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds in bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """
+    Observation counts per bucket. counts[i] holds the values in
+    (buckets[i - 1], buckets[i]]; the last count holds everything above.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        if tuple(other['buckets']) != self.buckets:
+            raise ValueError('cannot merge histograms with different buckets')
+        self.counts = [a + b for a, b in zip(self.counts, other['counts'])]
+        self.sum += other['sum']
+        self.count += other['count']
+
+    def to_dict(self):
+        return {'buckets': list(self.buckets), 'counts': list(self.counts), 'sum': self.sum, 'count': self.count}
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class Metrics:
+    """
+    Counters and histograms keyed by metric name and labels, safe to update
+    from several threads. snapshot() is plain JSON, and snapshots from several
+    runs or processes add up with merge().
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, dict(labels), h.to_dict()] for (name, labels), h in self.histograms.items()],
+            }
+
+    def merge(self, snapshot):
+        with self.lock:
+            for name, labels, value in snapshot.get('counters', []):
+                key = _key(name, labels)
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, labels, data in snapshot.get('histograms', []):
+                key = _key(name, labels)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(data['buckets'])
+                self.histograms[key].merge(data)
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels, extra=()):
+    pairs = sorted(labels.items()) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def to_prometheus(snapshot, descriptions=None):
+    """
+    A snapshot in the Prometheus text exposition format. descriptions maps
+    metric names to their # HELP text.
+    """
+    descriptions = descriptions or {}
+    families = {}
+    for name, labels, value in snapshot.get('counters', []):
+        families.setdefault((name, 'counter'), []).append((labels, value))
+    for name, labels, data in snapshot.get('histograms', []):
+        families.setdefault((name, 'histogram'), []).append((labels, data))
+
+    lines = []
+    for (name, kind), samples in sorted(families.items()):
+        if name in descriptions:
+            lines.append(f'# HELP {name} {_escape(descriptions[name])}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(samples, key=lambda sample: sorted(sample[0].items())):
+            if kind == 'counter':
+                lines.append(f'{name}{_labels(labels)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(list(value['buckets']) + [float('inf')], value['counts']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, [('le', _number(float(bound)))])} {cumulative}")
+            lines.append(f'{name}_sum{_labels(labels)} {_number(value["sum"])}')
+            lines.append(f'{name}_count{_labels(labels)} {value["count"]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,85 @@
+from eth_abi import decode, encode
+
+# Multicall3 is deployed at the same address on mainnet and most EVM chains
+MULTICALL3 = '0xcA11bde05977b3631167028862bE2a173976CA11'
+# aggregate3((address,bool,bytes)[]) returns ((bool,bytes)[])
+AGGREGATE3_SELECTOR = bytes.fromhex('82ad56cb')
+MAX_CALLS_PER_AGGREGATE = 500
+
+_REQUIRED = object()
+
+
+def aggregate3(calls, block_identifier='latest', w3=None):
+    """
+    Send [(target, calldata, allow_failure), ...] as one eth_call.
+    Returns [(success, return_data), ...] in the same order.
+    """
+    if w3 is None:
+        from brownie import web3 as w3
+
+    data = AGGREGATE3_SELECTOR + encode(['(address,bool,bytes)[]'], [calls])
+    raw = w3.eth.call({'to': MULTICALL3, 'data': '0x' + data.hex()}, block_identifier)
+    return decode(['(bool,bytes)[]'], bytes(raw))[0]
+
+
+def _abi_type(param):
+    if param['type'].startswith('tuple'):
+        inner = ','.join(_abi_type(component) for component in param['components'])
+        return f"({inner}){param['type'][len('tuple'):]}"
+    return param['type']
+
+
+def encode_call(contract, fn_name, args):
+    """
+    Calldata and output decoder for a brownie Contract or a web3 contract.
+    """
+    if hasattr(contract, 'functions'):
+        fn_abi = contract.get_function_by_name(fn_name).abi
+        output_types = [_abi_type(output) for output in fn_abi['outputs']]
+        calldata = contract.encodeABI(fn_name=fn_name, args=list(args))
+
+        def decoder(return_data):
+            values = decode(output_types, return_data)
+            return values[0] if len(values) == 1 else values
+
+        return contract.address, bytes.fromhex(calldata[2:]), decoder
+
+    method = getattr(contract, fn_name)
+    calldata = method.encode_input(*args)
+    return contract.address, bytes.fromhex(calldata[2:]), lambda return_data: method.decode_output('0x' + return_data.hex())
+
+
+class Multicall:
+    """
+    Collect contract reads for one block and send them as a single Multicall3
+    aggregate3 call. Every call is sent with allowFailure, so one revert does not
+    sink the batch: failed calls resolve to their default, or raise on execute()
+    when no default was given.
+    """
+
+    def __init__(self, block_identifier='latest', w3=None):
+        self.block_identifier = block_identifier
+        self.w3 = w3
+        self.calls = {}
+
+    def add(self, key, contract, fn_name, *args, default=_REQUIRED):
+        target, calldata, decoder = encode_call(contract, fn_name, args)
+        self.calls[key] = (target, calldata, decoder, default, fn_name)
+
+    def execute(self):
+        items = list(self.calls.items())
+        returned = []
+        for i in range(0, len(items), MAX_CALLS_PER_AGGREGATE):
+            chunk = items[i:i + MAX_CALLS_PER_AGGREGATE]
+            calls = [(target, True, calldata) for _, (target, calldata, _, _, _) in chunk]
+            returned += aggregate3(calls, self.block_identifier, self.w3)
+
+        results = {}
+        for (key, (target, _, decoder, default, fn_name)), (success, return_data) in zip(items, returned):
+            if success and return_data:
+                results[key] = decoder(return_data)
+            elif default is not _REQUIRED:
+                results[key] = default
+            else:
+                raise ValueError(f'{fn_name} on {target} reverted at block {self.block_identifier}')
+        return results
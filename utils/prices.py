@@ -0,0 +1,261 @@
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import requests
+
+from utils.concurrency import bucket_for
+from utils.store import atomic_write_bytes
+
+PRICE_CACHE_PATH = 'cache/prices.json'
+# Prices younger than this are served without a request
+PRICE_TTL = int(os.getenv('PRICE_TTL', 5 * 60))
+# Stale-if-error: when every source fails, serve a cached price up to this
+# old, flagged stale. Nothing refreshes prices in the background.
+STALE_IF_ERROR = int(os.getenv('PRICE_MAX_STALE', 24 * 60 * 60))
+REQUEST_TIMEOUT = 30
+
+DEFILLAMA_PRICE_API = 'https://coins.llama.fi/prices/current/{coins}?searchWidth=40h'
+DEFILLAMA_BATCH_SIZE = 100
+WAVEY_PRICE_API = 'https://prices.wavey.info/v1/price'
+
+# Requests per second per source. Anonymous Wavey requests are rate limited
+# after the first token, so pace them.
+SOURCE_RATE_LIMITS = {
+    'defillama': float(os.getenv('DEFILLAMA_RATE_LIMIT', 5)),
+    'wavey': float(os.getenv('WAVEY_RATE_LIMIT', 1)),
+}
+
+ENV_KEY_NAMES = (
+    'TOKEN_PRICE_AGG_KEY',
+    'TIDAL_DEPLOY_PRICE_API_KEY',
+    'FACTORY_DASHBOARD_DEPLOY_PRICE_API_KEY',
+)
+ENV_FILE_PATHS = (
+    Path(__file__).resolve().parents[1] / '.env',
+)
+
+
+def load_env_value_from_files(*keys):
+    for env_path in ENV_FILE_PATHS:
+        if not env_path.exists():
+            continue
+
+        values = {}
+        for line in env_path.read_text().splitlines():
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#') or '=' not in stripped:
+                continue
+
+            key, value = stripped.split('=', 1)
+            values[key.strip()] = value.strip().strip("'\"")
+
+        for key in keys:
+            if values.get(key):
+                return values[key]
+
+    return None
+
+
+TOKEN_PRICE_AGG_KEY = next(
+    (os.getenv(key_name) for key_name in ENV_KEY_NAMES if os.getenv(key_name)),
+    None,
+) or load_env_value_from_files(*ENV_KEY_NAMES)
+
+
+def fetch_defillama(tokens, chain='ethereum'):
+    """
+    {token: {'price', 'logo_url'}} for every token DefiLlama knows, in one
+    request per DEFILLAMA_BATCH_SIZE tokens
+    """
+    prices = {}
+    for i in range(0, len(tokens), DEFILLAMA_BATCH_SIZE):
+        batch = tokens[i:i + DEFILLAMA_BATCH_SIZE]
+        coins = ','.join(f'{chain}:{token}' for token in batch)
+        _acquire('defillama')
+        response = requests.get(DEFILLAMA_PRICE_API.format(coins=coins), timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        coins = {key.split(':', 1)[1].lower(): value for key, value in response.json()['coins'].items()}
+        for token in batch:
+            if token.lower() in coins:
+                prices[token] = {'price': Decimal(str(coins[token.lower()]['price'])), 'logo_url': ''}
+    return prices
+
+
+def fetch_wavey(tokens, chain_id=1):
+    """
+    The Wavey API prices one token per request; tokens it fails on are left out
+    """
+    headers = {}
+    if TOKEN_PRICE_AGG_KEY:
+        headers['Authorization'] = f'Bearer {TOKEN_PRICE_AGG_KEY}'
+
+    prices = {}
+    for token in tokens:
+        _acquire('wavey')
+        response = requests.get(
+            WAVEY_PRICE_API,
+            params={'token': token, 'chain_id': chain_id},
+            headers=headers,
+            timeout=REQUEST_TIMEOUT,
+        )
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {'status': response.status_code}
+        if not (response.ok and payload.get('summary')):
+            print(f'❌ Wavey price lookup failed for {token}: {payload}')
+            continue
+        selected_price = (payload.get('price_data') or {}).get('price')
+        price = payload['summary'].get('median_price') or selected_price
+        if price is not None:
+            prices[token] = {
+                'price': Decimal(str(price)),
+                'logo_url': (payload.get('token') or {}).get('logo_url') or '',
+            }
+    return prices
+
+
+SOURCES = {
+    'defillama': fetch_defillama,
+    'wavey': fetch_wavey,
+}
+
+_lock = threading.RLock()
+_cache = None
+_latency = {}
+
+
+def _acquire(source):
+    bucket_for(source, SOURCE_RATE_LIMITS[source]).acquire()
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        try:
+            with open(PRICE_CACHE_PATH, 'r') as file:
+                _cache = json.load(file)
+        except (OSError, ValueError):
+            _cache = {}
+    return _cache
+
+
+def _save_cache():
+    atomic_write_bytes(PRICE_CACHE_PATH, json.dumps(_cache, indent=4).encode('utf-8'))
+
+
+def _record_latency(source, seconds, failed):
+    counters = _latency.setdefault(source, {'requests': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+    counters['requests'] += 1
+    counters['errors'] += int(failed)
+    counters['total_seconds'] += seconds
+    counters['max_seconds'] = max(counters['max_seconds'], seconds)
+
+
+def latency_stats():
+    """
+    Per source: batches fetched, failed batches, total and mean/max seconds
+    """
+    with _lock:
+        return {
+            source: dict(counters, mean_seconds=counters['total_seconds'] / counters['requests'])
+            for source, counters in _latency.items()
+        }
+
+
+def _snapshot(entry, source, stale):
+    return {
+        'price': Decimal(entry['price']),
+        'logo_url': entry.get('logo_url', ''),
+        'source': source,
+        'fetched_at': entry['fetched_at'],
+        'stale': stale,
+    }
+
+
+def get_price_snapshots(tokens, sources=('defillama', 'wavey'), ttl=PRICE_TTL):
+    """
+    {token: {'price': Decimal, 'logo_url', 'source', 'fetched_at', 'stale'}}
+
+    Sources are asked in order of preference, each only for the tokens the
+    previous ones missed. A cached price younger than ttl stands in for a
+    request, but only once every source preferred over it has been tried.
+    If every source fails for a token, its last cached price is served with
+    stale=True as long as it is younger than STALE_IF_ERROR. Tokens with no
+    usable price are left out.
+
+    Requests are made without holding the module lock, so concurrent callers
+    may fetch the same token; the last response wins.
+    """
+    tokens = list(dict.fromkeys(tokens))
+    now = time.time()
+    results = {}
+    fetched = False
+    with _lock:
+        cache = _load_cache()
+        # The most preferred source with a fresh price for each token
+        fresh = {}
+        for token in tokens:
+            for source in sources:
+                entry = cache.get(source, {}).get(token.lower())
+                if entry and now - entry['fetched_at'] < ttl:
+                    fresh[token] = (source, dict(entry))
+                    break
+
+    for source in sources:
+        for token, (fresh_source, entry) in fresh.items():
+            if fresh_source == source and token not in results:
+                results[token] = _snapshot(entry, source, False)
+        missing = [token for token in tokens if token not in results]
+        if not missing:
+            break
+        started = time.perf_counter()
+        try:
+            prices = SOURCES[source](missing)
+        except Exception as e:
+            print(f'❌ {source} price request failed: {e}')
+            prices = {}
+            failed = True
+        else:
+            failed = False
+
+        with _lock:
+            _record_latency(source, time.perf_counter() - started, failed)
+            for token, price in prices.items():
+                entry = {'price': str(price['price']), 'logo_url': price['logo_url'], 'fetched_at': now}
+                cache.setdefault(source, {})[token.lower()] = entry
+                results[token] = _snapshot(entry, source, False)
+                fetched = True
+
+    with _lock:
+        for token in tokens:
+            if token in results:
+                continue
+            cached = [
+                (entry['fetched_at'], source, entry)
+                for source in sources
+                for entry in [cache.get(source, {}).get(token.lower())]
+                if entry and now - entry['fetched_at'] < STALE_IF_ERROR
+            ]
+            if cached:
+                _, source, entry = max(cached, key=lambda item: item[0])
+                print(f'⚠️  Serving a stale {source} price for {token}')
+                results[token] = _snapshot(entry, source, True)
+
+        if fetched:
+            _save_cache()
+    return results
+
+
+def get_prices(tokens, sources=('defillama', 'wavey')):
+    """
+    {token: price as a float}, leaving out tokens with no usable price
+    """
+    return {
+        token: float(snapshot['price'])
+        for token, snapshot in get_price_snapshots(tokens, sources).items()
+    }
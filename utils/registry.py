@@ -0,0 +1,150 @@
+import json
+import threading
+from functools import lru_cache
+
+from brownie import Contract, chain, web3
+
+from compounders_info import CURVE_LIQUID_LOCKER_COMPOUNDERS
+from utils.store import atomic_write_bytes
+
+# Each galloping probe reaches this many times further back than the last
+GALLOP_FACTOR = 8
+
+
+class ContractRegistry:
+    """
+    Creation blocks, ABIs and metadata of the contracts the scripts touch,
+    persisted as one JSON file keyed by lowercased address.
+
+    An unknown creation block is found by galloping backwards from the head:
+    probe head - 1, head - 8, head - 64, ... until an older block has no code,
+    then bisect that last gap. Recent contracts resolve in a handful of
+    get_code calls; the oldest cost a few more than a plain bisection, once.
+    An address with no code is recorded with the head it was checked at, so
+    the next search only probes the head and never looks below that block.
+    """
+
+    def __init__(self, path, get_code, get_height):
+        self.path = path
+        self.get_code = get_code
+        self.get_height = get_height
+        self.lock = threading.RLock()
+        self.rpc_count = 0
+        try:
+            with open(path, 'r') as file:
+                self.entries = json.load(file)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _save(self):
+        atomic_write_bytes(self.path, json.dumps(self.entries, indent=4, sort_keys=True).encode('utf-8'))
+
+    def _has_code(self, address, block):
+        self.rpc_count += 1
+        return bool(self.get_code(address, block))
+
+    def get(self, address):
+        return self.entries.get(address.lower())
+
+    def register(self, address, **metadata):
+        with self.lock:
+            entry = self.entries.setdefault(address.lower(), {'address': address})
+            if any(entry.get(key) != value for key, value in metadata.items()):
+                entry.update(metadata)
+                self._save()
+            return entry
+
+    def creation_block(self, address):
+        """
+        First block with code at address, or None when there is no code at the
+        head. Doesn't account for CREATE2 redeploys or SELFDESTRUCT.
+        """
+        entry = self.get(address) or {}
+        if 'creation_block' in entry:
+            return entry['creation_block']
+        # No code at or before this block, as of an earlier search
+        no_code_at = entry.get('no_code_at', -1)
+
+        head = self.get_height()
+        if head <= no_code_at:
+            return None
+        block = None
+        if self._has_code(address, head):
+            # Invariant: code at hi, no code at lo (or lo is before genesis)
+            hi, step = head, 1
+            while True:
+                probe = head - step
+                if probe <= no_code_at:
+                    lo = no_code_at
+                    break
+                if not self._has_code(address, probe):
+                    lo = probe
+                    break
+                hi, step = probe, step * GALLOP_FACTOR
+            while hi - lo > 1:
+                mid = lo + (hi - lo) // 2
+                if self._has_code(address, mid):
+                    hi = mid
+                else:
+                    lo = mid
+            block = hi
+
+        if block is None:
+            # No code yet may change, so keep the head it held at
+            self.register(address, no_code_at=head)
+        else:
+            self.register(address, creation_block=block)
+        return block
+
+    def abi(self, address):
+        entry = self.get(address)
+        if entry is None or 'abi' not in entry:
+            entry = self.register(address, abi=Contract(address).abi)
+        return entry['abi']
+
+    def seed(self, contracts):
+        """
+        contracts: {address: metadata}. Registers each one; creation blocks
+        are only searched for when creation_block asks for them.
+        """
+        for address, metadata in contracts.items():
+            self.register(address, **metadata)
+
+
+@lru_cache(maxsize=None)
+def get_registry():
+    return ContractRegistry(
+        f'cache/{chain.id}/contract_registry.json',
+        lambda address, block: web3.eth.get_code(address, block_identifier=block),
+        lambda: chain.height,
+    )
+
+
+def known_contracts(wallets=(), contracts=()):
+    """
+    The compounders with their underlying tokens and pegs, plus wallets and
+    other contracts given as (name, address) pairs. Compounders with a
+    deploy_block in compounders_info are seeded with it as their creation block.
+    """
+    known = {}
+    for address, info in CURVE_LIQUID_LOCKER_COMPOUNDERS.items():
+        known[address] = {'name': info['name'], 'symbol': info['symbol'], 'kind': 'compounder'}
+        if 'deploy_block' in info:
+            known[address]['creation_block'] = info['deploy_block']
+        known[info['underlying']] = {'name': f"{info['symbol']} underlying", 'kind': 'underlying'}
+        known[info['pool']] = {'name': f"{info['symbol']} peg pool", 'kind': 'pool'}
+    for name, address in wallets:
+        known[address] = {'name': name, 'kind': 'wallet'}
+    for name, address in contracts:
+        known[address] = {'name': name, 'kind': 'contract'}
+    return known
+
+
+def seed_known_contracts(wallets=(), contracts=()):
+    registry = get_registry()
+    registry.seed(known_contracts(wallets, contracts))
+    return registry
+
+
+def contract_creation_block(address):
+    return get_registry().creation_block(address)
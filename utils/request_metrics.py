@@ -0,0 +1,220 @@
+# Request metrics for the Flask app: latency, response size and status per
+# route, database queries and cache file reads, served on /metrics.
+# Each worker process counts in memory and periodically writes a snapshot to
+# METRICS_DIR/<pid>-<start_ns>.json; a scrape merges every worker's snapshot,
+# so any worker can answer it. The start time keeps a recycled pid from
+# overwriting an exited worker's snapshot before it is retired.
+# Retiring uses fcntl.flock, so this module runs on POSIX only.
+# Imported by app.py, so this module must not import brownie.
+import atexit
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+
+import utils.metrics as metrics
+from utils.store import atomic_write_bytes
+
+METRICS_DIR = os.getenv('FLASK_METRICS_DIR', 'data/metrics/flask')
+# A worker's snapshot on disk is at most this many seconds behind its counters
+FLUSH_SECONDS = float(os.getenv('FLASK_METRICS_FLUSH_SECONDS', 5))
+# Snapshots of exited workers are folded into this file so counters stay monotonic
+RETIRED_FILE = 'retired.json'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNMATCHED_ROUTE = '<unmatched>'
+# DB queries made outside a request, e.g. by CLI commands
+NO_ROUTE = '<none>'
+
+DESCRIPTIONS = {
+    'http_requests_total': 'Requests served, by route, method and status code',
+    'http_request_seconds': 'Time from routing to the response being ready, by route',
+    'http_response_bytes': 'Response body size, by route; streamed responses are left out',
+    'http_db_queries_total': 'SQL statements executed, by route',
+    'http_db_query_seconds': 'SQL statement execution time, by route',
+    'http_cache_file_read_seconds': 'Time to read a cache file that changed on disk, by file',
+}
+
+
+class RequestMetrics:
+    def __init__(self, directory=METRICS_DIR, flush_seconds=FLUSH_SECONDS):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.metrics = metrics.Metrics()
+        self.pid = os.getpid()
+        self.started_ns = time.time_ns()
+        self.flushed_at = time.monotonic()
+        self.flush_lock = threading.Lock()
+
+    def _current(self):
+        # A worker forked after counting (e.g. gunicorn --preload) starts from zero
+        if os.getpid() != self.pid:
+            self.metrics.reset()
+            self.pid = os.getpid()
+            self.started_ns = time.time_ns()
+        return self.metrics
+
+    def inc(self, name, value=1, **labels):
+        self._current().inc(name, value, **labels)
+        self.maybe_flush()
+
+    def observe(self, name, value, buckets=metrics.LATENCY_BUCKETS, **labels):
+        self._current().observe(name, value, buckets, **labels)
+
+    def snapshot_path(self):
+        return os.path.join(self.directory, f'{self.pid}-{self.started_ns}.json')
+
+    def maybe_flush(self):
+        if time.monotonic() - self.flushed_at >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        if not self.flush_lock.acquire(blocking=False):
+            return
+        try:
+            self.flushed_at = time.monotonic()
+            body = json.dumps(self._current().snapshot()).encode('utf-8')
+            atomic_write_bytes(self.snapshot_path(), body)
+        finally:
+            self.flush_lock.release()
+
+    def _retire_exited_workers(self):
+        """
+        Fold the snapshots of workers that have exited into RETIRED_FILE,
+        under a file lock so concurrent scrapes do not fold one twice
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            retired = metrics.Metrics()
+            retired_path = os.path.join(self.directory, RETIRED_FILE)
+            exited = []
+            for path in glob.glob(os.path.join(self.directory, '*.json')):
+                pid = _snapshot_pid(path)
+                if pid is None or _is_alive(pid):
+                    continue
+                exited.append(path)
+            if not exited:
+                return
+            for path in [retired_path] + exited:
+                snapshot = _read_snapshot(path)
+                if snapshot:
+                    retired.merge(snapshot)
+            atomic_write_bytes(retired_path, json.dumps(retired.snapshot()).encode('utf-8'))
+            for path in exited:
+                os.remove(path)
+
+    def collect(self):
+        """
+        Every worker's counters merged, this worker's up to the moment
+        """
+        self.flush()
+        self._retire_exited_workers()
+        merged = metrics.Metrics()
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            snapshot = _read_snapshot(path)
+            if snapshot:
+                merged.merge(snapshot)
+        return merged.snapshot()
+
+    def to_prometheus(self):
+        return metrics.to_prometheus(self.collect(), DESCRIPTIONS)
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _snapshot_pid(path):
+    """
+    The pid in a <pid>-<start_ns>.json snapshot name, or in a <pid>.json one
+    written before snapshots carried a start time; None for other files
+    """
+    pid, _, started_ns = os.path.basename(path)[:-len('.json')].partition('-')
+    if not pid.isdigit() or not (started_ns.isdigit() or not started_ns):
+        return None
+    return int(pid)
+
+
+def _read_snapshot(path):
+    try:
+        with open(path, 'rb') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def current_route():
+    if not has_request_context():
+        return None
+    rule = request.url_rule
+    return rule.rule if rule is not None else UNMATCHED_ROUTE
+
+
+_metrics = RequestMetrics()
+
+
+def observe_cache_read(path, seconds):
+    _metrics.observe('http_cache_file_read_seconds', seconds, file=os.path.basename(path))
+
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+
+
+def _after_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    route = current_route()
+    _metrics.observe('http_request_seconds', time.perf_counter() - started, route=route, method=request.method)
+    if not response.is_streamed:
+        _metrics.observe(
+            'http_response_bytes', response.calculate_content_length() or 0, metrics.SIZE_BUCKETS, route=route,
+        )
+    _metrics.inc('http_requests_total', route=route, method=request.method, status=str(response.status_code))
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get('metrics_started')
+    if not stack:
+        return
+    seconds = time.perf_counter() - stack.pop()
+    route = current_route() or NO_ROUTE
+    _metrics.observe('http_db_query_seconds', seconds, route=route)
+    _metrics.inc('http_db_queries_total', route=route)
+
+
+def metrics_view():
+    return Response(_metrics.to_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def init_app(app, path='/metrics'):
+    """
+    Record every request app serves and every SQL statement SQLAlchemy runs,
+    and serve the merged metrics of all workers at path
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    app.add_url_rule(path, 'metrics', metrics_view)
+    atexit.register(_metrics.flush)
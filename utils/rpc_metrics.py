@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+
+from eth_abi import decode
+from eth_utils import function_abi_to_4byte_selector
+
+import utils.metrics as metrics
+from utils.call_cache import installed_caches
+from utils.multicall import AGGREGATE3_SELECTOR, MULTICALL3
+from utils.store import atomic_write_bytes
+
+METRICS_DIR = 'data/metrics'
+
+DESCRIPTIONS = {
+    'rpc_requests_total': 'JSON-RPC requests sent to the node, by method',
+    'rpc_errors_total': 'JSON-RPC requests that raised or returned an error, by method',
+    'rpc_request_seconds': 'JSON-RPC round trip time, by method',
+    'rpc_sent_bytes_total': 'JSON-encoded request params sent, by method',
+    'rpc_received_bytes_total': 'JSON-encoded results received, by method',
+    'rpc_contract_calls_total': 'Contract functions read, directly or inside a Multicall3 aggregate3',
+    'rpc_call_cache_hits_total': 'eth_calls answered by the on-disk call cache',
+    'rpc_call_cache_misses_total': 'eth_calls at finalized blocks the call cache had to forward',
+}
+
+_selector_names = {}
+_selector_lock = threading.Lock()
+
+
+def register_abi(abi):
+    """
+    Name the contract functions in abi, so calls to them are counted by name
+    rather than by selector
+    """
+    names = {
+        function_abi_to_4byte_selector(entry).hex(): entry['name']
+        for entry in abi
+        if entry.get('type') == 'function'
+    }
+    with _selector_lock:
+        _selector_names.update(names)
+
+
+def register_contracts(addresses):
+    """
+    register_abi for each address, with ABIs from the contract registry
+    """
+    from utils.registry import get_registry
+
+    registry = get_registry()
+    for address in addresses:
+        try:
+            register_abi(registry.abi(address))
+        except Exception as e:
+            print(f'⚠️  No ABI for {address}: {e}')
+
+
+def function_name(calldata):
+    selector = calldata[:4].hex()
+    return _selector_names.get(selector, '0x' + selector)
+
+
+def _calldata(tx):
+    data = tx.get('data') or tx.get('input') or b''
+    return bytes.fromhex(data[2:]) if isinstance(data, str) else bytes(data)
+
+
+def _size(value):
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return len(json.dumps(value, default=str))
+
+
+class RpcMetrics:
+    """
+    Request counts, latency histograms and bytes per JSON-RPC method, plus
+    reads per contract function, for one run of a script. Calls batched into
+    a Multicall3 aggregate3 are counted under the functions they carry.
+    """
+
+    def __init__(self):
+        self.metrics = metrics.Metrics()
+        self.started = time.time()
+
+    def record(self, method, params, response, seconds, failed):
+        self.metrics.inc('rpc_requests_total', method=method)
+        self.metrics.observe('rpc_request_seconds', seconds, method=method)
+        self.metrics.inc('rpc_sent_bytes_total', _size(params), method=method)
+        if failed:
+            self.metrics.inc('rpc_errors_total', method=method)
+        else:
+            self.metrics.inc('rpc_received_bytes_total', _size(response.get('result')), method=method)
+        if method == 'eth_call' and params:
+            self._record_functions(params[0])
+
+    def _record_functions(self, tx):
+        calldata = _calldata(tx)
+        if (tx.get('to') or '').lower() == MULTICALL3.lower() and calldata[:4] == AGGREGATE3_SELECTOR:
+            for _, _, inner in decode(['(address,bool,bytes)[]'], calldata[4:])[0]:
+                self.metrics.inc('rpc_contract_calls_total', function=function_name(inner), via='multicall')
+        else:
+            self.metrics.inc('rpc_contract_calls_total', function=function_name(calldata), via='eth_call')
+
+    def snapshot(self):
+        """
+        The recorded metrics, with the call cache's hits and misses added as
+        counters
+        """
+        snapshot = self.metrics.snapshot()
+        for cache in installed_caches():
+            snapshot['counters'].append(['rpc_call_cache_hits_total', {}, cache.hits])
+            snapshot['counters'].append(['rpc_call_cache_misses_total', {}, cache.misses])
+        return snapshot
+
+    def summary(self):
+        """
+        Per method: requests, errors, total and mean seconds, bytes sent and
+        received. Per contract function: reads. Plus the call cache's stats.
+        """
+        snapshot = self.metrics.snapshot()
+        methods = {}
+        functions = {}
+        for name, labels, value in snapshot['counters']:
+            if name == 'rpc_contract_calls_total':
+                counts = functions.setdefault(labels['function'], {'eth_call': 0, 'multicall': 0})
+                counts[labels['via']] += value
+                continue
+            entry = methods.setdefault(labels['method'], {'requests': 0, 'errors': 0})
+            entry[name[len('rpc_'):-len('_total')]] = value
+        for name, labels, histogram in snapshot['histograms']:
+            entry = methods[labels['method']]
+            entry['total_seconds'] = histogram['sum']
+            entry['mean_seconds'] = histogram['sum'] / histogram['count']
+
+        return {
+            'started': self.started,
+            'duration_seconds': time.time() - self.started,
+            'requests': sum(entry['requests'] for entry in methods.values()),
+            'methods': dict(sorted(methods.items(), key=lambda item: -item[1]['requests'])),
+            'functions': dict(sorted(functions.items(), key=lambda item: -sum(item[1].values()))),
+            'call_cache': [cache.stats() for cache in installed_caches()],
+        }
+
+    def to_prometheus(self):
+        return metrics.to_prometheus(self.snapshot(), DESCRIPTIONS)
+
+    def write(self, run_name, directory=METRICS_DIR):
+        """
+        Write the run summary to <directory>/rpc_<run_name>.json and the
+        metrics to rpc_<run_name>.prom, for a node_exporter textfile collector
+        """
+        summary_path = os.path.join(directory, f'rpc_{run_name}.json')
+        atomic_write_bytes(summary_path, json.dumps(self.summary(), indent=4).encode('utf-8'))
+        atomic_write_bytes(os.path.join(directory, f'rpc_{run_name}.prom'), self.to_prometheus().encode('utf-8'))
+        return summary_path
+
+
+def rpc_metrics_middleware(rpc_metrics):
+    def middleware(make_request, w3):
+        def inner(method, params):
+            started = time.perf_counter()
+            response = None
+            try:
+                response = make_request(method, params)
+            finally:
+                failed = response is None or 'error' in response
+                rpc_metrics.record(method, params, response, time.perf_counter() - started, failed)
+            return response
+        return inner
+    return middleware
+
+
+_installed = {}
+
+
+def install(w3=None):
+    """
+    Record every JSON-RPC request w3 sends. Idempotent. The middleware sits
+    innermost, so it sees only requests that reach the node: eth_calls the
+    call cache answers are not counted, and time spent waiting on the rate
+    limiter is not included when it is installed after install_rate_limit.
+    """
+    if w3 is None:
+        from brownie import web3 as w3
+    if id(w3) not in _installed:
+        rpc_metrics = RpcMetrics()
+        w3.middleware_onion.inject(rpc_metrics_middleware(rpc_metrics), name='rpc_metrics', layer=0)
+        _installed[id(w3)] = rpc_metrics
+    return _installed[id(w3)]
@@ -0,0 +1,190 @@
+# Sharded cache store for the data served by app.py. Each section is its own
+# compact JSON file under data/store/, written via temp file + os.replace so
+# readers never see a partial file. manifest.json is rewritten after every
+# write and carries the versions the Flask app keys its caches on; writers
+# update it under an fcntl.flock, so the store is POSIX-only.
+# Imported by app.py, so this module must not import brownie.
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STORE_DIR = 'data/store'
+LEGACY_CACHE_PATH = 'data/ll_info.json'
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_LOCK_FILE = '.manifest.lock'
+PAYLOAD_DIR = 'payloads'
+
+# Content-Encoding -> file suffix, in the order the app prefers them
+COMPRESSED_VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+# Section name -> top-level keys of the legacy ll_info.json it owns
+SECTIONS = {
+    'll_data': ('ll_data', 'last_updated'),
+    'chart_data': ('chart_data',),
+    'curve_gauges': ('curve_gauge_data', 'curve_gauges_by_name', 'curve_gauge_data_last_updated'),
+    'treasury': ('treasury_balance_sheet',),
+}
+
+
+def dump_json_bytes(data):
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def atomic_write_bytes(path, body):
+    directory = os.path.dirname(path) or '.'
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(body)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def manifest_path(store_dir=STORE_DIR):
+    return os.path.join(store_dir, MANIFEST_FILE)
+
+
+def section_path(section, store_dir=STORE_DIR):
+    if section not in SECTIONS:
+        raise KeyError(f'Unknown cache section: {section}')
+    return os.path.join(store_dir, f'{section}.json')
+
+
+def payload_path(name, store_dir=STORE_DIR):
+    return os.path.join(store_dir, PAYLOAD_DIR, f'{name}.json')
+
+
+def read_manifest(store_dir=STORE_DIR):
+    try:
+        with open(manifest_path(store_dir), 'rb') as file:
+            return json.loads(file.read())
+    except FileNotFoundError:
+        return {'version': 0, 'sections': {}, 'payloads': {}}
+
+
+def _record(manifest, kind, name, path, body, store_dir):
+    previous = manifest[kind].get(name, {})
+    manifest[kind][name] = {
+        'file': os.path.relpath(path, store_dir),
+        'version': previous.get('version', 0) + 1,
+        'updated': int(time.time()),
+        'bytes': len(body),
+        'sha256': hashlib.sha256(body).hexdigest(),
+    }
+    manifest['version'] = manifest.get('version', 0) + 1
+    manifest['updated'] = int(time.time())
+
+
+def _write_and_record(kind, name, path, body, store_dir):
+    atomic_write_bytes(path, body)
+    # Concurrent writers, e.g. the chart refresh and update_info, would
+    # otherwise drop each other's manifest entries
+    with open(os.path.join(store_dir, MANIFEST_LOCK_FILE), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        manifest = read_manifest(store_dir)
+        manifest.setdefault('sections', {})
+        manifest.setdefault('payloads', {})
+        _record(manifest, kind, name, path, body, store_dir)
+        atomic_write_bytes(manifest_path(store_dir), dump_json_bytes(manifest))
+
+
+def write_section(section, data, store_dir=STORE_DIR):
+    """
+    Replace one section. data must only contain the keys the section owns.
+    """
+    unknown = set(data) - set(SECTIONS[section])
+    if unknown:
+        raise KeyError(f'Keys {sorted(unknown)} do not belong to section {section}')
+    _write_and_record('sections', section, section_path(section, store_dir), dump_json_bytes(data), store_dir)
+
+
+def compress(body, encoding):
+    if encoding == 'gzip':
+        # mtime=0 keeps the output, and so the ETag, stable for identical bodies
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(body, quality=11)
+    return None
+
+
+def write_payload(name, body, store_dir=STORE_DIR):
+    """
+    Store pre-serialized response bytes, e.g. the Recharts chart payloads,
+    along with gzip and brotli variants so the app never compresses per request.
+    Brotli is skipped when the brotli package is not installed.
+    """
+    path = payload_path(name, store_dir)
+    for encoding, suffix in COMPRESSED_VARIANTS:
+        compressed = compress(body, encoding)
+        if compressed is not None:
+            atomic_write_bytes(path + suffix, compressed)
+        elif os.path.exists(path + suffix):
+            # Never leave a variant behind that no longer matches the body
+            os.remove(path + suffix)
+    _write_and_record('payloads', name, path, body, store_dir)
+
+
+def publish_info_payloads(store_dir=STORE_DIR):
+    """
+    Store the merged /info response and the treasury balance sheet as payloads.
+    Call after the sections of a refresh have been written.
+    """
+    data = read_all(store_dir)
+    write_payload('info', dump_json_bytes(data), store_dir)
+    if data.get('treasury_balance_sheet'):
+        write_payload('treasury_balance_sheet', dump_json_bytes(data['treasury_balance_sheet']), store_dir)
+
+
+def read_section(section, store_dir=STORE_DIR):
+    try:
+        with open(section_path(section, store_dir), 'rb') as file:
+            return json.loads(file.read())
+    except FileNotFoundError:
+        return {}
+
+
+def read_all(store_dir=STORE_DIR):
+    """
+    Merge every section back into the legacy ll_info.json shape.
+    """
+    data = {}
+    for section in SECTIONS:
+        data.update(read_section(section, store_dir))
+    return data
+
+
+def migrate_legacy_cache(legacy_path=LEGACY_CACHE_PATH, store_dir=STORE_DIR):
+    """
+    Split an existing monolithic ll_info.json into sections. No-op once the
+    store has a manifest or when there is nothing to migrate.
+    """
+    if os.path.exists(manifest_path(store_dir)) or not os.path.exists(legacy_path):
+        return False
+
+    with open(legacy_path, 'r') as file:
+        legacy = json.load(file)
+
+    for section, keys in SECTIONS.items():
+        data = {key: legacy[key] for key in keys if key in legacy}
+        if data:
+            write_section(section, data, store_dir)
+    publish_info_payloads(store_dir)
+    return True
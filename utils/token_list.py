@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import time
+
+import requests
+
+from utils.store import atomic_write_bytes
+
+# Imported by app.py, so this module must not import brownie.
+
+TOKEN_LIST_URL = 'https://raw.githubusercontent.com/SmolDapp/tokenLists/main/lists/coingecko.json'
+TOKEN_LIST_PATH = 'cache/token_list.json'
+LOGO_DIR = 'cache/token-logos'
+LOGO_ROUTE = '/api/crvlol/token-logos'
+# Within this window the local copy is used without asking the server at all
+REVALIDATE_SECONDS = int(os.getenv('TOKEN_LIST_REVALIDATE_SECONDS', 6 * 60 * 60))
+REQUEST_TIMEOUT = 30
+LOGO_EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/svg+xml': '.svg',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+}
+
+_lock = threading.Lock()
+_index = None
+
+
+def build_index(token_list):
+    """
+    {chain_id: {lowercased address: token}} from a token list document
+    """
+    index = {}
+    for token in token_list.get('tokens', []):
+        chain_id = str(token.get('chainId', 1))
+        index.setdefault(chain_id, {})[token['address'].lower()] = {
+            'address': token['address'],
+            'symbol': token.get('symbol', ''),
+            'name': token.get('name', ''),
+            'decimals': token.get('decimals'),
+            'logo_url': token.get('logoURI', ''),
+        }
+    return index
+
+
+def _read_local():
+    try:
+        with open(TOKEN_LIST_PATH, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def refresh(local=None):
+    """
+    Revalidate the local copy with a conditional GET. The list is only
+    downloaded and re-indexed when the server reports a change.
+    """
+    headers = {}
+    if local:
+        if local.get('etag'):
+            headers['If-None-Match'] = local['etag']
+        if local.get('last_modified'):
+            headers['If-Modified-Since'] = local['last_modified']
+
+    response = requests.get(TOKEN_LIST_URL, headers=headers, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304 and local:
+        local['checked_at'] = time.time()
+    else:
+        response.raise_for_status()
+        local = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'checked_at': time.time(),
+            'tokens': build_index(response.json()),
+        }
+    atomic_write_bytes(TOKEN_LIST_PATH, json.dumps(local).encode('utf-8'))
+    return local
+
+
+def get_index():
+    """
+    The token index, loaded once per process and revalidated against the
+    server at most every REVALIDATE_SECONDS. A failed refresh keeps serving
+    the local copy.
+    """
+    global _index
+    with _lock:
+        if _index is not None and time.time() - _index['checked_at'] < REVALIDATE_SECONDS:
+            return _index['tokens']
+        local = _index or _read_local()
+        if local is None or time.time() - local.get('checked_at', 0) >= REVALIDATE_SECONDS:
+            try:
+                local = refresh(local)
+            except (requests.RequestException, ValueError) as e:
+                if local is None:
+                    raise
+                print(f'⚠️  Token list refresh failed, using the local copy: {e}')
+                local['checked_at'] = time.time()
+        _index = local
+        return _index['tokens']
+
+
+def get_token(address, chain_id=1):
+    return get_index().get(str(chain_id), {}).get(address.lower())
+
+
+def get_logo_url(address, chain_id=1):
+    token = get_token(address, chain_id)
+    return token['logo_url'] if token else ''
+
+
+def logo_dir(chain_id):
+    return os.path.join(LOGO_DIR, str(chain_id))
+
+
+def cached_logo_filename(address, chain_id=1):
+    directory = logo_dir(chain_id)
+    prefix = address.lower() + '.'
+    if os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            if filename.startswith(prefix):
+                return filename
+    return None
+
+
+def cache_logo(address, chain_id=1, logo_url=None):
+    """
+    Download a token's logo into LOGO_DIR/<chain_id>/ unless it is already
+    there, and return the path the Flask app serves it under. logo_url
+    overrides the token list's logo. Returns None when no logo is available.
+    """
+    filename = cached_logo_filename(address, chain_id)
+    if filename is None:
+        logo_url = logo_url or get_logo_url(address, chain_id)
+        if not logo_url:
+            return None
+        try:
+            response = requests.get(logo_url, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f'❌ Could not download the logo for {address}: {e}')
+            return None
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+        filename = address.lower() + LOGO_EXTENSIONS.get(content_type, '.png')
+        atomic_write_bytes(os.path.join(logo_dir(chain_id), filename), response.content)
+    return f'{LOGO_ROUTE}/{chain_id}/{filename}'
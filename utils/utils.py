@@ -1,8 +1,18 @@
-from brownie import ZERO_ADDRESS, Contract, web3, accounts, chain
-import requests, json, os
+from brownie import Contract, chain
+import json
 from datetime import datetime
-from functools import lru_cache
 from utils.cache import memory
+from utils.store import atomic_write_bytes
+import utils.prices as prices
+import utils.token_list as token_list
+import utils.ens as ens
+import utils.logs as logs
+import utils.registry as registry
+import utils.boost_warehouse as boost_warehouse
+from utils.block_index import (
+    closest_block_after_timestamp,
+    get_block_timestamp,
+)
 
 DAY = 60 * 60 * 24
 WEEK = DAY * 7
@@ -54,32 +64,9 @@ def get_week_end_ts(contract, week_number=0):
     return start - 1
 
 def block_to_date(b):
-    time = chain[b].timestamp
+    time = get_block_timestamp(b)
     return datetime.fromtimestamp(time)
 
-def closest_block_after_timestamp(timestamp: int) -> int:
-    height = chain.height
-    lo, hi = 0, height
-
-    while hi - lo > 1:
-        mid = lo + (hi - lo) // 2
-        if get_block_timestamp(mid) > timestamp:
-            hi = mid
-        else:
-            lo = mid
-
-    if get_block_timestamp(hi) < timestamp:
-        raise Exception("timestamp is in the future")
-
-    return hi
-
-@memory.cache()
-def closest_block_before_timestamp(timestamp: int) -> int:
-    return closest_block_after_timestamp(timestamp) - 1
-
-def get_block_timestamp(height):
-    return chain[height].timestamp
-
 def timestamp_to_date_string(ts):
     return datetime.utcfromtimestamp(ts).strftime("%m/%d/%Y, %H:%M:%S")
 
@@ -88,93 +75,52 @@ def timestamp_to_string(ts):
     return dt
 
 def get_prices(tokens=[]):
-    # Query DefiLlama for all of our coin prices
-    coins = ','.join(f'ethereum:{k}' for k in tokens)
-    url = f'https://coins.llama.fi/prices/current/{coins}?searchWidth=40h'
-    response = requests.get(url).json()['coins']
-    response = {key.replace('ethereum:', ''): value for key, value in response.items()}
-    prices = {}
-    for t in tokens:
-        if t in response:
-            prices[t] = response[t]['price']
-    return prices
+    # DefiLlama first, batched and cached by utils.prices
+    return prices.get_prices(tokens)
 
-@memory.cache()
 def get_token_logo_urls(token_address):
-    url = 'https://raw.githubusercontent.com/SmolDapp/tokenLists/main/lists/coingecko.json'
-    data = requests.get(url).json()
-    logo_url = ''
-    for d in data['tokens']:
-        if token_address == d['address']:
-            logo_url = d['logoURI']
-            return logo_url
-    return ''
+    return token_list.get_logo_url(token_address)
 
 def get_ens_from_cache(address):
-    ens_data = load_from_json('ens_cache.json')
-    if address in ens_data:
-        return ens_data[address]
-    return ''
+    return ens.lookup(address)
 
-@memory.cache()
 def contract_creation_block(address):
     """
-    Find contract creation block using binary search.
+    Block the contract was deployed in, from the shared contract registry.
     NOTE Requires access to historical state. Doesn't account for CREATE2 or SELFDESTRUCT.
     """
-    lo = 0
-    hi = end = chain.height
+    return registry.contract_creation_block(address)
 
-    while hi - lo > 1:
-        mid = lo + (hi - lo) // 2
-        code = web3.eth.get_code(address, block_identifier=mid)
-        if code:
-            hi = mid
-        else:
-            lo = mid
-
-
-    return hi if hi != end else None
-
-def get_logs_chunked(contract, event_name, start_block=0, end_block=0, chunk_size=100_000):
+def iter_event_logs(contract, event_name, start_block=0, end_block=0, chunk_size=logs.DEFAULT_CHUNK_SIZE, checkpoint_path=None):
+    """
+    Stream decoded event logs in block order. With checkpoint_path, a scan
+    from the same start_block resumes after the last block it fully yielded.
+    """
     try:
         event = getattr(contract.events, event_name)
     except Exception as e:
         print(f'Contract has no event by the name {event_name}', e)
+        raise
 
     if start_block == 0:
         start_block = contract_creation_block(contract.address)
     if end_block == 0:
         end_block = chain.height
 
-    logs = []
-    while start_block < end_block:
-        logs += event.getLogs(fromBlock=start_block, toBlock=min(end_block, start_block + chunk_size))
-        start_block += chunk_size
+    return logs.iter_logs(
+        lambda lo, hi: event.getLogs(fromBlock=lo, toBlock=hi),
+        start_block,
+        end_block,
+        chunk_size=chunk_size,
+        checkpoint_path=checkpoint_path,
+    )
 
-    return logs
+def get_logs_chunked(contract, event_name, start_block=0, end_block=0, chunk_size=logs.DEFAULT_CHUNK_SIZE, checkpoint_path=None):
+    return list(iter_event_logs(contract, event_name, start_block, end_block, chunk_size, checkpoint_path))
 
 def cache_ens():
-    ens_data = load_from_json('ens_cache.json')
-    if ens_data is None:
-        ens_data = {}
-
-    records = load_from_json('raw_boost_data.json')['data']
-
-    count = 0
-    for record in records:
-        a, r, d = record['account'], record['receiver'], record['boost_delegate']
-        count += 1
-        for address in [a, r, d]:
-            if address == ZERO_ADDRESS:
-                continue
-            # if address not in ens_data or ens_data[address] is '':
-            if address not in ens_data:
-                ens = web3.ens.name(address)
-                ens = '' if ens is None or ens == 'null' else ens
-                ens_data[address] = ens
-                print(address, ens)
-    cache_to_json('ens_cache.json', ens_data)
+    boost_warehouse.refresh()
+    ens.resolve(boost_warehouse.addresses())
 
 # Loading the dictionary from a JSON file
 # Should add .json file extension to the end
@@ -187,28 +133,13 @@ def load_from_json(file_path):
     
 # Saving the dictionary to a JSON file
 # Should add .json file extension to the end
+# Written to a temp file and renamed, so readers never see a partial file
 def cache_to_json(file_path, data_dict):
-    directory = os.path.dirname(file_path)
-    
-    # Check if the directory exists, and create it if it doesn't
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-
-    with open(file_path, 'w') as file:
-        json.dump(data_dict, file, indent=4)
+    atomic_write_bytes(file_path, json.dumps(data_dict, indent=4).encode('utf-8'))
 
 def sql_query_boost_data(sql):
+    # Local scan of the boost_data table; call boost_warehouse.refresh() to pull new records
     import pandas as pd
-    import duckdb
-    import requests
-    url = 'https://raw.githubusercontent.com/wavey0x/open-data/master/raw_boost_data.json'
-    data = requests.get(url).json()['data']
-    df = pd.DataFrame(data)
-
-    # load data into virtual db
-    con = duckdb.connect(database=':memory:')
-    con.register('boost_data', df)
-
-    results = con.execute(sql).fetchdf()
+    results = boost_warehouse.query(sql)
     pd.set_option('display.max_colwidth', None)
-    return results
\ No newline at end of file
+    return results
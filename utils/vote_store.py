@@ -0,0 +1,128 @@
+import os
+import tempfile
+
+import utils.store as store
+
+# Imported by app.py, so this module must not import brownie. duckdb is only
+# needed by the ingestion script, pyarrow only by readers of the rollups.
+
+VOTES_DB = 'data/gauge_votes.duckdb'
+ROLLUP_DIR = os.path.join(store.STORE_DIR, 'gauge_votes')
+WEEK = 60 * 60 * 24 * 7
+
+VOTES_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS votes (
+    block BIGINT NOT NULL,
+    tx_hash VARCHAR NOT NULL,
+    log_index INTEGER NOT NULL,
+    time BIGINT NOT NULL,
+    "user" VARCHAR NOT NULL,
+    gauge VARCHAR NOT NULL,
+    weight INTEGER NOT NULL,
+    amount DOUBLE NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+)
+'''
+
+# Each rollup is exported to ROLLUP_DIR/<name>.parquet. The API only ever reads
+# these, never the raw votes table.
+ROLLUPS = {
+    # Standing vote of every user on every gauge; weight 0 means the vote was removed
+    'current_votes': '''
+        SELECT v.tx_hash || ':' || v.log_index AS id,
+               v.gauge, v."user" AS account, COALESCE(a.alias, '') AS account_alias,
+               v.time, v.block, v.weight, v.amount
+        FROM (
+            SELECT * FROM votes
+            QUALIFY row_number() OVER (PARTITION BY gauge, "user" ORDER BY block DESC, log_index DESC) = 1
+        ) v
+        LEFT JOIN aliases a ON lower(a.address) = lower(v."user")
+        WHERE v.weight > 0
+        ORDER BY v.gauge, v.time DESC, v.block DESC, v.log_index DESC
+    ''',
+    'gauge_epochs': f'''
+        SELECT gauge, time // {WEEK} * {WEEK} AS epoch,
+               count(*) AS votes,
+               count(DISTINCT "user") AS voters,
+               sum(weight)::BIGINT AS weight,
+               sum(amount) AS amount,
+               count(*) FILTER (WHERE weight = 0) AS removals
+        FROM votes
+        GROUP BY ALL
+        ORDER BY gauge, epoch
+    ''',
+    'user_epochs': f'''
+        SELECT "user" AS account, time // {WEEK} * {WEEK} AS epoch,
+               count(*) AS votes,
+               count(DISTINCT gauge) AS gauges,
+               sum(weight)::BIGINT AS weight,
+               sum(amount) AS amount
+        FROM votes
+        GROUP BY ALL
+        ORDER BY account, epoch
+    ''',
+}
+
+
+def rollup_path(name):
+    return os.path.join(ROLLUP_DIR, f'{name}.parquet')
+
+
+def connect(path=VOTES_DB):
+    import duckdb
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    con = duckdb.connect(path)
+    con.execute(VOTES_SCHEMA)
+    return con
+
+
+def last_block(con):
+    return con.execute('SELECT max(block) FROM votes').fetchone()[0]
+
+
+def insert_votes(con, rows):
+    """
+    rows: (block, tx_hash, log_index, time, user, gauge, weight, amount)
+    Re-inserting a vote that is already stored is a no-op.
+    """
+    con.executemany('INSERT OR IGNORE INTO votes VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+
+def export_rollups(con, aliases=None):
+    """
+    Recompute every rollup and write it as Parquet. Each file is written to a
+    temp file and renamed into place, so the API never reads a partial file.
+    """
+    if not os.path.exists(ROLLUP_DIR):
+        os.makedirs(ROLLUP_DIR)
+    con.execute('CREATE OR REPLACE TEMP TABLE aliases (address VARCHAR, alias VARCHAR)')
+    con.executemany('INSERT INTO aliases VALUES (?, ?)', [(k, v) for k, v in (aliases or {}).items() if v])
+
+    for name, sql in ROLLUPS.items():
+        fd, tmp_path = tempfile.mkstemp(dir=ROLLUP_DIR, prefix=f'.{name}.', suffix='.parquet')
+        os.close(fd)
+        try:
+            con.execute(f"COPY ({sql}) TO '{tmp_path}' (FORMAT PARQUET)")
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, rollup_path(name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def read_rollup(raw, key):
+    """
+    Parse a rollup's Parquet bytes into {lowercased key column value: [rows]},
+    keeping the row order the rollup was written in.
+    """
+    import pyarrow
+    import pyarrow.parquet as parquet
+
+    grouped = {}
+    for row in parquet.read_table(pyarrow.BufferReader(raw)).to_pylist():
+        grouped.setdefault(row[key].lower(), []).append(row)
+    return grouped
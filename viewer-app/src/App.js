@@ -136,7 +136,9 @@ const Footer = () => {
   useEffect(() => {
     const fetchLastUpdated = async () => {
       try {
-        const response = await axiosInstance.get('api/crvlol/info');
+        const response = await axiosInstance.get('api/crvlol/info', {
+          params: { fields: 'last_updated' },
+        });
         const timestamp = response.data.last_updated;
         if (timestamp) {
           setLastUpdated(timestamp);
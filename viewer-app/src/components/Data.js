@@ -49,7 +49,9 @@ const Data = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const response = await axiosInstance.get('api/crvlol/info');
+        const response = await axiosInstance.get('api/crvlol/info', {
+          params: { fields: 'll_data,chart_data' },
+        });
         setData(response.data.ll_data || {});
 
         // Process chart data
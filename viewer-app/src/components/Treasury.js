@@ -116,10 +116,14 @@ const Treasury = () => {
                 >
                   <div className="treasury-asset-main">
                     <div className="treasury-token-logo-shell">
-                      {row.logo_url &&
+                      {(row.logo_path || row.logo_url) &&
                       !failedLogos[`${wallet.address}-${row.label}`] ? (
                         <img
-                          src={row.logo_url}
+                          src={
+                            row.logo_path
+                              ? `${normalizedApiBaseUrl}${row.logo_path}`
+                              : row.logo_url
+                          }
                           alt=""
                           className="treasury-token-logo"
                           loading="lazy"